@@ -0,0 +1,378 @@
+"""Offline benchmark: drives the automation pipeline with fake DDGS and SMTP stand-ins.
+
+Example:
+    python benchmark.py --automations 1000 --cycles 2 --search-latency 0.05 --output bench.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import smtplib
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+
+# --- Fake stand-ins ---
+class FakeDDGS:
+    """DDGS replacement returning synthetic news results after a configurable delay"""
+    latency = 0.05
+    jitter = 0.02
+    results_per_query = 8
+    alert_ratio = 0.5
+
+    _lock = threading.Lock()
+    queries = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def text(self, query: str, max_results: int = 8) -> List[Dict[str, str]]:
+        with FakeDDGS._lock:
+            FakeDDGS.queries += 1
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        # Echo the query back so the result mentions the searched location
+        results = []
+        for i in range(min(max_results, self.results_per_query)):
+            if random.random() < self.alert_ratio:
+                results.append({
+                    "title": f"Breaking: earthquake emergency today - {query}",
+                    "href": f"https://www.reuters.com/world/{abs(hash((query, i)))}",
+                    "body": f"{query} earthquake evacuation emergency news today, officials said",
+                })
+            else:
+                results.append({
+                    "title": f"Weekend events - {query}",
+                    "href": f"https://example.org/{abs(hash((query, i)))}",
+                    "body": "Things to do last month",
+                })
+        return results
+
+
+class FakeSMTP:
+    """smtplib.SMTP replacement that accepts every message into an in-memory sink"""
+    connect_latency = 0.05
+    send_latency = 0.01
+
+    _lock = threading.Lock()
+    connections = 0
+    messages = 0
+    bytes_sent = 0
+
+    def __init__(self, host: str = "", port: int = 0, timeout: float | None = None):
+        time.sleep(self.connect_latency)
+        with FakeSMTP._lock:
+            FakeSMTP.connections += 1
+
+    def starttls(self, *args, **kwargs):
+        return (220, b"ready")
+
+    def login(self, user, password):
+        return (235, b"ok")
+
+    def noop(self):
+        return (250, b"ok")
+
+    def sendmail(self, from_addr, to_addrs, msg, *args, **kwargs):
+        time.sleep(self.send_latency)
+        with FakeSMTP._lock:
+            FakeSMTP.messages += 1
+            FakeSMTP.bytes_sent += len(msg)
+        return {}
+
+    def quit(self):
+        return (221, b"bye")
+
+    def close(self):
+        pass
+
+
+# --- Measurements ---
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(max(values) * 1000, 3) if values else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+    }
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process, from /proc when available"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 2)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+class LoopStallMonitor:
+    """Measures how late the event loop wakes a periodic sleeper"""
+
+    def __init__(self, interval: float = 0.01, stall_threshold: float = 0.005):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.delays: List[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.delays.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self) -> Dict[str, float]:
+        stalls = [d for d in self.delays if d > self.stall_threshold]
+        return {
+            'samples': len(self.delays),
+            'stalls': len(stalls),
+            'total_stall_ms': round(sum(stalls) * 1000, 3),
+            'max_stall_ms': round(max(self.delays) * 1000, 3) if self.delays else 0.0,
+            'p99_delay_ms': round(percentile(self.delays, 99) * 1000, 3),
+        }
+
+
+# --- Benchmark run ---
+async def run_benchmark(args: argparse.Namespace, log) -> Dict[str, Any]:
+    import main
+    import utils
+    from search_backends import DDGSBackend
+
+    utils.SEARCH_BACKEND = DDGSBackend(utils.SEARCH_EXECUTOR, utils.DDGS_TIMEOUT, FakeDDGS)
+    smtplib.SMTP = FakeSMTP
+
+    cycle_latencies: List[float] = []
+    cycle_errors = 0
+    real_worker = main.automation_worker
+
+    async def timed_worker(automation_key: str) -> float | None:
+        nonlocal cycle_errors
+        started = time.perf_counter()
+        try:
+            return await real_worker(automation_key)
+        except Exception:
+            cycle_errors += 1
+            raise
+        finally:
+            cycle_latencies.append(time.perf_counter() - started)
+
+    # track_disaster_alerts schedules partial(automation_worker, key), resolved from the module globals
+    main.automation_worker = timed_worker
+
+    monitor = LoopStallMonitor()
+    monitor.start()
+    rss_start = current_rss_mb()
+
+    # Phase 1: register automations through the MCP tool (includes the initial preview search)
+    locations = args.locations or args.automations
+    setup_latencies: List[float] = []
+    setup_limit = asyncio.Semaphore(args.setup_concurrency)
+
+    async def track(i: int) -> None:
+        async with setup_limit:
+            started = time.perf_counter()
+            await main.track_disaster_alerts.fn(
+                location=f"Benchtown {i % locations}",
+                user_email=f"bench{i}@example.com",
+                interval_seconds=args.interval,
+                total_times=args.cycles,
+                report_mode=args.report_mode,
+            )
+            setup_latencies.append(time.perf_counter() - started)
+
+    setup_started = time.perf_counter()
+    await asyncio.gather(*(track(i) for i in range(args.automations)))
+    setup_seconds = time.perf_counter() - setup_started
+    log(f"registered {args.automations} automations in {setup_seconds:.2f}s")
+
+    # Phase 2: let the scheduler run every automation to completion. First runs start while
+    # automations are still being registered, so cycle time is measured from the start of setup
+    deadline = time.perf_counter() + args.timeout
+    while main.RUNNING_AUTOMATIONS and time.perf_counter() < deadline:
+        await asyncio.sleep(0.1)
+    cycles_seconds = time.perf_counter() - setup_started
+    timed_out = bool(main.RUNNING_AUTOMATIONS)
+    log(f"ran {len(cycle_latencies)} cycles in {cycles_seconds:.2f}s" + (" (timed out)" if timed_out else ""))
+
+    await monitor.stop()
+    scheduler_stats = main.SCHEDULER.stats()
+    search_stats = utils.SEARCH_EXECUTOR.stats()
+    email_stats = main.EMAIL_PIPELINE.stats()
+
+    await main.SCHEDULER.stop()
+    await main.EMAIL_PIPELINE.stop()
+    await utils.SEARCH_EXECUTOR.stop()
+    main.AUTOMATION_STORE.close()
+
+    return {
+        'benchmark': 'automcp-offline',
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        'python': platform.python_version(),
+        'config': {
+            'automations': args.automations,
+            'locations': locations,
+            'cycles': args.cycles,
+            'interval_seconds': args.interval,
+            'report_mode': args.report_mode,
+            'setup_concurrency': args.setup_concurrency,
+            'search_latency_seconds': FakeDDGS.latency,
+            'search_jitter_seconds': FakeDDGS.jitter,
+            'alert_ratio': FakeDDGS.alert_ratio,
+            'smtp_connect_latency_seconds': FakeSMTP.connect_latency,
+            'smtp_send_latency_seconds': FakeSMTP.send_latency,
+            'search_workers': utils.SEARCH_EXECUTOR.max_workers,
+            'search_rate_per_second': utils.SEARCH_EXECUTOR.rate_limiter.rate_per_second,
+            'search_cache_ttl_seconds': utils.SEARCH_CACHE.ttl_seconds,
+            'scheduler_workers': main.SCHEDULER.worker_count,
+            'smtp_concurrency': main.EMAIL_PIPELINE.concurrency,
+            'store': bool(args.db),
+        },
+        'setup': {
+            'seconds': round(setup_seconds, 3),
+            'per_second': round(args.automations / setup_seconds, 2) if setup_seconds else 0.0,
+            **latency_summary(setup_latencies),
+        },
+        'cycles': {
+            'seconds': round(cycles_seconds, 3),
+            'per_second': round(len(cycle_latencies) / cycles_seconds, 2) if cycles_seconds else 0.0,
+            'errors': cycle_errors,
+            'timed_out': timed_out,
+            'unfinished_automations': len(main.RUNNING_AUTOMATIONS),
+            **latency_summary(cycle_latencies),
+        },
+        'throughput': {
+            'search_queries': FakeDDGS.queries,
+            'search_queries_per_second': round(FakeDDGS.queries / cycles_seconds, 2) if cycles_seconds else 0.0,
+            'emails': FakeSMTP.messages,
+            'emails_per_second': round(FakeSMTP.messages / cycles_seconds, 2) if cycles_seconds else 0.0,
+            'email_bytes': FakeSMTP.bytes_sent,
+            'smtp_connections': FakeSMTP.connections,
+        },
+        'event_loop': monitor.summary(),
+        'memory': {
+            'rss_start_mb': rss_start,
+            'rss_end_mb': current_rss_mb(),
+            'rss_peak_mb': peak_rss_mb(),
+        },
+        'scheduler': scheduler_stats,
+        'search_executor': search_stats,
+        'email_pipeline': email_stats,
+    }
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline AutoMCP benchmark with fake search and SMTP backends")
+    parser.add_argument("--automations", type=int, default=1000, help="automations to register")
+    parser.add_argument("--locations", type=int, default=0,
+                        help="distinct locations shared by the automations (0 = one per automation)")
+    parser.add_argument("--cycles", type=int, default=2, help="executions per automation")
+    parser.add_argument("--interval", type=int, default=10, help="seconds between executions (minimum 10)")
+    parser.add_argument("--report-mode", choices=("full", "changes"), default="full")
+    parser.add_argument("--setup-concurrency", type=int, default=100,
+                        help="track_disaster_alerts calls in flight at once")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="fake DDGS latency per query (s)")
+    parser.add_argument("--search-jitter", type=float, default=0.02, help="uniform +/- jitter on search latency (s)")
+    parser.add_argument("--alert-ratio", type=float, default=0.5, help="share of fake results that are alerts")
+    parser.add_argument("--smtp-connect-latency", type=float, default=0.05, help="fake SMTP connect latency (s)")
+    parser.add_argument("--smtp-send-latency", type=float, default=0.01, help="fake SMTP send latency (s)")
+    parser.add_argument("--search-workers", type=int, help="override SEARCH_EXECUTOR_WORKERS")
+    parser.add_argument("--search-rate", type=float, default=0.0,
+                        help="override SEARCH_RATE_PER_SECOND (default 0 = unlimited)")
+    parser.add_argument("--cache-ttl", type=float, help="override SEARCH_CACHE_TTL_SECONDS")
+    parser.add_argument("--scheduler-workers", type=int, help="override SCHEDULER_WORKERS")
+    parser.add_argument("--spread-window", type=float, default=0.0,
+                        help="override SCHEDULER_SPREAD_WINDOW_SECONDS (default 0 = run first cycles at once)")
+    parser.add_argument("--smtp-concurrency", type=int, help="override SMTP_CONCURRENCY and SMTP_POOL_SIZE")
+    parser.add_argument("--db", action="store_true", help="persist automations to a temporary SQLite store")
+    parser.add_argument("--timeout", type=float, default=600.0, help="give up waiting for cycles after this (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="keep the server's own log output")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings are read at import time, so they must be in the environment before importing main"""
+    overrides = {
+        'AUTH_TOKEN': os.environ.get('AUTH_TOKEN', 'benchmark'),
+        'MY_NUMBER': os.environ.get('MY_NUMBER', '0'),
+        'AUTOMATION_DB_PATH': os.path.join(tempfile.mkdtemp(prefix="automcp-bench-"), "automations.db") if args.db else "",
+        'QUERY_CACHE_PATH': "",  # every cycle should reach the fake search backend
+        'SEARCH_RATE_PER_SECOND': args.search_rate,
+        'SCHEDULER_SPREAD_WINDOW_SECONDS': args.spread_window,
+        'SEARCH_EXECUTOR_WORKERS': args.search_workers,
+        'SEARCH_CACHE_TTL_SECONDS': args.cache_ttl,
+        'SCHEDULER_WORKERS': args.scheduler_workers,
+        'SMTP_CONCURRENCY': args.smtp_concurrency,
+        'SMTP_POOL_SIZE': args.smtp_concurrency,
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+    random.seed(args.seed)
+    FakeDDGS.latency = args.search_latency
+    FakeDDGS.jitter = args.search_jitter
+    FakeDDGS.alert_ratio = args.alert_ratio
+    FakeSMTP.connect_latency = args.smtp_connect_latency
+    FakeSMTP.send_latency = args.smtp_send_latency
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+    configure_environment(args)
+
+    def log(message: str) -> None:
+        print(f"[benchmark] {message}", file=sys.stderr)
+
+    # The server prints a few lines per search and email; keep them out of the measurement output
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        result = asyncio.run(run_benchmark(args, log))
+
+    output = json.dumps(result, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        log(f"results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
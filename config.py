@@ -0,0 +1,126 @@
+import os
+from dotenv import load_dotenv
+
+# --- Load environment variables ---
+load_dotenv()
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to default"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Invalid value for {name}: {value!r}, using default {default}")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to default"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Invalid value for {name}: {value!r}, using default {default}")
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting (1/0, true/false, yes/no, on/off) from the environment"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Search result cache (shared by every automation in the process)
+SEARCH_CACHE_TTL_SECONDS = env_float("SEARCH_CACHE_TTL_SECONDS", 300.0)
+SEARCH_CACHE_MAX_ENTRIES = env_int("SEARCH_CACHE_MAX_ENTRIES", 256)
+
+# Search executor (dedicated DDGS thread pool + token bucket; rate 0 disables limiting)
+SEARCH_EXECUTOR_WORKERS = env_int("SEARCH_EXECUTOR_WORKERS", 4)
+SEARCH_RATE_PER_SECOND = env_float("SEARCH_RATE_PER_SECOND", 2.0)
+SEARCH_RATE_BURST = env_int("SEARCH_RATE_BURST", 6)
+
+# Search backends, comma separated: ddgs (live web) and/or feed (offline RSS/Atom/JSON files or
+# directories listed in SEARCH_FEED_PATHS); several backends are queried in parallel and merged,
+# leaving out any that has not answered within SEARCH_MERGE_DEADLINE_SECONDS
+SEARCH_BACKENDS = os.environ.get("SEARCH_BACKENDS", "ddgs")
+SEARCH_FEED_PATHS = os.environ.get("SEARCH_FEED_PATHS", "")
+SEARCH_MERGE_DEADLINE_SECONDS = env_float("SEARCH_MERGE_DEADLINE_SECONDS", 10.0)
+
+# Persistent cache of raw search responses (SQLite, keyed by query and max_results) so a restart
+# does not start cold; set the path to an empty value (or TTL/max entries to 0) to disable it
+QUERY_CACHE_PATH = os.environ.get("QUERY_CACHE_PATH", "query_cache.db")
+QUERY_CACHE_TTL_SECONDS = env_float("QUERY_CACHE_TTL_SECONDS", 300.0)
+QUERY_CACHE_MAX_ENTRIES = env_int("QUERY_CACHE_MAX_ENTRIES", 5000)
+
+# Search resilience: per-query timeout and overall deadline (0 disables either), retries with
+# exponential backoff, hedging (second copy of a query still running after this many seconds; 0 = off)
+# and a circuit breaker per query template (opens after N consecutive failures, 0 = off)
+SEARCH_QUERY_TIMEOUT_SECONDS = env_float("SEARCH_QUERY_TIMEOUT_SECONDS", 15.0)
+SEARCH_DEADLINE_SECONDS = env_float("SEARCH_DEADLINE_SECONDS", 30.0)
+SEARCH_QUERY_RETRIES = env_int("SEARCH_QUERY_RETRIES", 1)
+SEARCH_RETRY_BACKOFF_SECONDS = env_float("SEARCH_RETRY_BACKOFF_SECONDS", 1.0)
+SEARCH_HEDGE_AFTER_SECONDS = env_float("SEARCH_HEDGE_AFTER_SECONDS", 0.0)
+SEARCH_BREAKER_FAILURES = env_int("SEARCH_BREAKER_FAILURES", 5)
+SEARCH_BREAKER_RESET_SECONDS = env_float("SEARCH_BREAKER_RESET_SECONDS", 60.0)
+
+# Query planner: every Nth search of a location runs all query templates, the ones in between only
+# the templates that found its alerts (at least MIN_TEMPLATES); 0 runs every template every time
+SEARCH_PLANNER_EXPLORE_EVERY = env_int("SEARCH_PLANNER_EXPLORE_EVERY", 6)
+SEARCH_PLANNER_MIN_TEMPLATES = env_int("SEARCH_PLANNER_MIN_TEMPLATES", 2)
+
+# Offline gazetteer (bundled JSON) mapping location spellings and aliases to one canonical place;
+# set to an empty value to key searches on the location text only
+GAZETTEER_PATH = os.environ.get(
+    "GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.json")
+)
+
+# Durable automation store (SQLite, WAL mode); set to an empty value to keep automations in memory only
+AUTOMATION_DB_PATH = os.environ.get("AUTOMATION_DB_PATH", "automations.db")
+
+# Automation scheduler
+SCHEDULER_WORKERS = env_int("SCHEDULER_WORKERS", 16)
+SCHEDULER_LAG_WARNING_SECONDS = env_float("SCHEDULER_LAG_WARNING_SECONDS", 1.0)
+# Random delay added to every first run, and the window first runs are spread over
+# (least loaded second, capped at the automation's interval)
+SCHEDULER_START_JITTER_SECONDS = env_float("SCHEDULER_START_JITTER_SECONDS", 0.0)
+SCHEDULER_SPREAD_WINDOW_SECONDS = env_float("SCHEDULER_SPREAD_WINDOW_SECONDS", 300.0)
+
+# Email delivery (SMTP connection pool)
+SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = env_int("SMTP_PORT", 587)
+SMTP_STARTTLS = env_bool("SMTP_STARTTLS", True)
+SMTP_POOL_SIZE = env_int("SMTP_POOL_SIZE", 2)
+SMTP_CONCURRENCY = env_int("SMTP_CONCURRENCY", 2)
+SMTP_IDLE_CHECK_SECONDS = env_float("SMTP_IDLE_CHECK_SECONDS", 30.0)
+SMTP_TIMEOUT_SECONDS = env_float("SMTP_TIMEOUT_SECONDS", 30.0)
+# Rendered email bodies kept per distinct report
+EMAIL_RENDER_CACHE_SIZE = env_int("EMAIL_RENDER_CACHE_SIZE", 64)
+
+# Metrics endpoint (/metrics); when set, scrapers must send "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Search tracing: per-stage spans appended as JSON lines to TRACE_FILE (empty disables tracing);
+# TRACE_SAMPLE_RATE is the share of searches traced
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+TRACE_SAMPLE_RATE = env_float("TRACE_SAMPLE_RATE", 1.0)
+
+# Worker processes running automations; each automation_key is owned by one shard (consistent hashing).
+# 1 runs everything in the server process
+SHARD_COUNT = env_int("SHARD_COUNT", 1)
+# With shards, /metrics leaves out a shard that has not sent its samples within this many seconds
+SHARD_METRICS_TIMEOUT_SECONDS = env_float("SHARD_METRICS_TIMEOUT_SECONDS", 5.0)
+
+# Bulk tracking: initial searches run at most this many at a time; entries accepted per call
+BULK_SEARCH_CONCURRENCY = env_int("BULK_SEARCH_CONCURRENCY", 4)
+BULK_MAX_ENTRIES = env_int("BULK_MAX_ENTRIES", 200)
+
+# track_disaster_alerts returns right away; it waits at most this long for the first run's report
+# to include it as a preview (0 = never wait)
+TRACK_PREVIEW_WAIT_SECONDS = env_float("TRACK_PREVIEW_WAIT_SECONDS", 0.0)
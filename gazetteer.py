@@ -0,0 +1,109 @@
+import json
+import re
+from typing import Dict, Iterable, List, NamedTuple
+
+# Punctuation that does not change which place is meant ("St. Louis", "Washington D.C.")
+_PUNCTUATION = re.compile(r"[.'’()\"]")
+
+# Shorter aliases would match inside unrelated words of a result
+MIN_TERM_LENGTH = 3
+
+
+def clean_location(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace, keeping commas as part separators"""
+    parts = (" ".join(_PUNCTUATION.sub("", part).casefold().split()) for part in text.split(","))
+    return ", ".join(part for part in parts if part)
+
+
+class Place(NamedTuple):
+    id: str                 # canonical location ID, e.g. 'in-delhi'
+    name: str               # name used in search queries
+    aliases: tuple          # cleaned spellings that mean this place, including the name
+    terms: tuple            # lowercase spellings looked for in result text
+    qualifiers: frozenset   # cleaned region/country names accepted after a comma ("Delhi, India")
+
+
+class Gazetteer:
+    """Offline lookup from user supplied location text to a canonical place with aliases"""
+
+    def __init__(self, entries: Iterable[Dict]):
+        self._by_id: Dict[str, Place] = {}
+        self._by_alias: Dict[str, Place] = {}
+        for entry in entries:
+            spellings = [entry['name'], *entry.get('aliases', ())]
+            aliases = tuple(dict.fromkeys(clean_location(spelling) for spelling in spellings))
+            place = Place(
+                id=entry['id'],
+                name=entry['name'],
+                aliases=aliases,
+                terms=tuple(dict.fromkeys(
+                    term for spelling in spellings for term in (spelling.casefold(), clean_location(spelling))
+                    if len(term) >= MIN_TERM_LENGTH
+                )),
+                qualifiers=frozenset(clean_location(q) for q in entry.get('within', ())),
+            )
+            self._by_id[place.id] = place
+            for alias in aliases:
+                # First entry wins, so list the more commonly meant place first in the data file
+                self._by_alias.setdefault(alias, place)
+
+    @classmethod
+    def load(cls, path: str | None) -> "Gazetteer":
+        """Gazetteer from a JSON file of {id, name, aliases, within} entries; empty if path is unset or unreadable"""
+        if not path:
+            return cls(())
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Gazetteer not loaded from {path}: {str(e)}")
+            return cls(())
+        gazetteer = cls(entries)
+        print(f"Gazetteer loaded: {len(gazetteer)} places")
+        return gazetteer
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def resolve(self, location: str) -> Place | None:
+        """Place meant by location (a spelling, alias or place ID), or None if it is not in the gazetteer"""
+        place = self._by_id.get(location)
+        if place is not None:
+            return place
+
+        cleaned = clean_location(location)
+        place = self._by_alias.get(cleaned)
+        if place is not None:
+            return place
+
+        # "Delhi, India" / "Mumbai, Maharashtra, India": a known place followed only by its own region or country
+        head, *rest = cleaned.split(", ")
+        place = self._by_alias.get(head)
+        if place is not None and rest and all(part in place.qualifiers for part in rest):
+            return place
+        return None
+
+    def canonical_key(self, location: str) -> str:
+        """Place ID if the location is known, else its cleaned text; equivalent spellings share one key"""
+        place = self.resolve(location)
+        return place.id if place is not None else clean_location(location)
+
+    def search_name(self, location: str) -> str:
+        """Name to search for: the canonical place name if known, else the location as given"""
+        place = self.resolve(location)
+        return place.name if place is not None else location.strip()
+
+    def match_terms(self, location: str) -> List[str]:
+        """Lowercase terms whose presence in a result means it is about this location.
+
+        A known place matches by its own spellings only, the same for every alias, since its reports
+        are shared under one key. Other locations match as typed, their comma parts and the cleaned
+        forms of both, since results spell a place with its punctuation ("St. Louis", "Coeur d'Alene").
+        """
+        place = self.resolve(location)
+        if place is not None:
+            return list(place.terms)
+        cleaned = clean_location(location)
+        raw = " ".join(location.casefold().split())
+        terms = [raw, *(part.strip() for part in raw.split(",")), cleaned, *cleaned.split(", ")]
+        return [term for term in dict.fromkeys(terms) if term]
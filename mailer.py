@@ -0,0 +1,205 @@
+import asyncio
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Callable, Dict, List, Tuple
+
+from metrics import EMAILS, SMTP_CONNECT_SECONDS, SMTP_SEND_SECONDS
+
+
+def build_email_template(from_header: str, subject: str, plain_text: str, html_body: str) -> bytes:
+    """Serialize a plain/HTML alternative email once, without any recipient header"""
+    msg = MIMEMultipart('alternative', policy=policy.SMTP)
+    msg['From'] = from_header
+    msg['Subject'] = subject
+    msg.attach(MIMEText(plain_text, 'plain', 'utf-8', policy=policy.SMTP))
+    msg.attach(MIMEText(html_body, 'html', 'utf-8', policy=policy.SMTP))
+    return msg.as_bytes()
+
+
+def stamp_recipient(template: bytes, recipient: str) -> bytes:
+    """Prefix a serialized template with the per-recipient To header"""
+    return policy.SMTP.fold_binary('To', recipient) + template
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of long-lived, authenticated SMTP connections"""
+
+    def __init__(self, host: str, port: int, username: str | None, password: str | None,
+                 use_starttls: bool = True, max_connections: int = 2,
+                 idle_check_seconds: float = 30.0, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_starttls = use_starttls
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(max(1, max_connections))
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+
+        self.connects = 0
+        self.reconnects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        with SMTP_CONNECT_SECONDS.time():
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.use_starttls:
+                    server.starttls()
+                if self.username and self.password:
+                    server.login(self.username, self.password)
+            except BaseException:
+                # Do not leak the socket of a half-open connection
+                self._close(server)
+                raise
+        self.connects += 1
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _checkout(self) -> smtplib.SMTP:
+        with self._lock:
+            entry = self._idle.pop() if self._idle else None
+
+        if entry is None:
+            return self._connect()
+
+        server, last_used = entry
+        # Connections idle for a while may have been dropped by the server
+        if time.monotonic() - last_used > self.idle_check_seconds:
+            try:
+                status, _ = server.noop()
+                if status != 250:
+                    raise smtplib.SMTPServerDisconnected(f"NOOP returned {status}")
+            except (smtplib.SMTPException, OSError):
+                self._close(server)
+                self.reconnects += 1
+                return self._connect()
+        return server
+
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+
+    def send_raw(self, from_addr: str, to_addr: str, data: bytes) -> None:
+        """Send an already serialized message on a pooled connection, reconnecting once if it went stale"""
+        self._with_connection(lambda server: server.sendmail(from_addr, [to_addr], data))
+
+    def _with_connection(self, send: Callable[[smtplib.SMTP], Any]) -> None:
+        with self._slots:
+            server = self._checkout()
+            try:
+                with SMTP_SEND_SECONDS.time():
+                    send(server)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                # The server rejected this message but the connection is still usable
+                self._checkin(server)
+                raise
+            except OSError:
+                # Stale or dropped connection (SMTPServerDisconnected, resets): retry once on a fresh one
+                self._close(server)
+                self.reconnects += 1
+                server = self._connect()
+                try:
+                    with SMTP_SEND_SECONDS.time():
+                        send(server)
+                except BaseException:
+                    self._close(server)
+                    raise
+            except BaseException:
+                # Anything else (e.g. a recipient that cannot be encoded) may leave the session mid-command
+                self._close(server)
+                raise
+            self._checkin(server)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+
+class EmailDeliveryPipeline:
+    """Queue of outgoing emails delivered off the event loop through an SMTP connection pool"""
+
+    def __init__(self, pool: SMTPConnectionPool, concurrency: int = 2, max_queue_size: int = 0):
+        self.pool = pool
+        self.concurrency = max(1, concurrency)
+        self.max_queue_size = max_queue_size
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="smtp")
+        self._queue: asyncio.Queue | None = None
+        self._senders: List[asyncio.Task] = []
+
+        self.sent = 0
+        self.failed = 0
+
+    def ensure_started(self) -> None:
+        """Start the sender tasks on the running event loop if needed"""
+        if self._senders and not all(task.done() for task in self._senders):
+            return
+
+        self._queue = asyncio.Queue(self.max_queue_size)
+        self._senders = [asyncio.create_task(self._sender_loop()) for _ in range(self.concurrency)]
+
+    async def send_raw(self, from_addr: str, to_addr: str, data: bytes) -> bool:
+        """Queue an already serialized message for to_addr and wait until it was sent. Returns False on failure"""
+        return await self._enqueue(to_addr, lambda: self.pool.send_raw(from_addr, to_addr, data))
+
+    async def _enqueue(self, recipient: str, send: Callable[[], None]) -> bool:
+        self.ensure_started()
+        delivered = asyncio.get_running_loop().create_future()
+        await self._queue.put((recipient, send, delivered))
+        return await delivered
+
+    async def _sender_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            recipient, send, delivered = await self._queue.get()
+            try:
+                await loop.run_in_executor(self._executor, send)
+                self.sent += 1
+                EMAILS.inc(outcome="sent")
+                if not delivered.done():
+                    delivered.set_result(True)
+            except Exception as e:
+                self.failed += 1
+                EMAILS.inc(outcome="failed")
+                print(f" Failed to send email to {recipient}: {str(e)}")
+                if not delivered.done():
+                    delivered.set_result(False)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'senders': self.concurrency,
+            'sent': self.sent,
+            'failed': self.failed,
+            'connects': self.pool.connects,
+            'reconnects': self.pool.reconnects,
+        }
+
+    async def stop(self) -> None:
+        """Stop the sender tasks and close pooled connections"""
+        for task in self._senders:
+            task.cancel()
+        await asyncio.gather(*self._senders, return_exceptions=True)
+        self._senders = []
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.pool.close)
@@ -1,17 +1,33 @@
 import asyncio
+import time
 from typing import Annotated, Dict, Any
 import os
 from dotenv import load_dotenv
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from fastmcp.server.auth.providers.bearer import BearerAuthProvider, RSAKeyPair
 from mcp.server.auth.provider import AccessToken
 from mcp.types import TextContent, ImageContent, INVALID_PARAMS, INTERNAL_ERROR
 from pydantic import BaseModel, Field
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 from datetime import datetime, timedelta
-from utils import search_disaster_alerts
+from functools import partial
+from config import (
+    AUTOMATION_DB_PATH, SCHEDULER_WORKERS, SCHEDULER_LAG_WARNING_SECONDS,
+    SCHEDULER_START_JITTER_SECONDS, SCHEDULER_SPREAD_WINDOW_SECONDS,
+    SMTP_HOST, SMTP_PORT, SMTP_STARTTLS, SMTP_POOL_SIZE, SMTP_CONCURRENCY,
+    SMTP_IDLE_CHECK_SECONDS, SMTP_TIMEOUT_SECONDS, EMAIL_RENDER_CACHE_SIZE, METRICS_TOKEN, SHARD_COUNT,
+    SHARD_METRICS_TIMEOUT_SECONDS, BULK_SEARCH_CONCURRENCY, BULK_MAX_ENTRIES, TRACK_PREVIEW_WAIT_SECONDS,
+)
+from caching import TTLCache
+from mailer import EmailDeliveryPipeline, SMTPConnectionPool, build_email_template, stamp_recipient
+from metrics import AUTOMATION_RUN_SECONDS, EMAILS, REGISTRY
+from scheduler import AutomationScheduler
+from sharding import HashRing, ShardRouter, serve_shard
+from store import AutomationStore
+from registry import AutomationRegistry
+from reports import DisasterReport, format_disaster_report, render_email_bodies, render_email_subject
+from utils import QUERY_CACHE, SEARCH_EXECUTOR, TRACER, normalize_location, search_disaster_report
 
 # --- Load environment variables ---
 load_dotenv()
@@ -27,183 +43,81 @@ assert TOKEN is not None, "Please set AUTH_TOKEN in your .env file"
 assert MY_NUMBER is not None, "Please set MY_NUMBER in your .env file"
 
 # Global dictionary to store running automations
-RUNNING_AUTOMATIONS: Dict[str, Dict[str, Any]] = {}
+RUNNING_AUTOMATIONS = AutomationRegistry()
 
-# Global dictionary to store async tasks
-AUTOMATION_TASKS: Dict[str, asyncio.Task] = {}
+# Durable copy of RUNNING_AUTOMATIONS so monitors resume after a restart
+AUTOMATION_STORE = AutomationStore(AUTOMATION_DB_PATH)
 
-# --- Professional Email Sending Function ---
-async def send_email_report(user_email: str, location: str, report_content: str) -> bool:
-    """Send clean professional disaster report via email to the user"""
-    try:
+# Report modes: 'full' emails the whole report every run, 'changes' only new or escalated alerts
+REPORT_MODES = ("full", "changes")
 
-        if "🚨" in report_content:
-            severity_emoji = "🚨"
-        elif "🔴" in report_content:
-            severity_emoji = "🔴"
-        elif "🟠" in report_content:
-            severity_emoji = "🟠"
-        elif "🟡" in report_content:
-            severity_emoji = "🟡"
-        elif "🟢" in report_content:
-            severity_emoji = "🟢"
-        elif "NO CRITICAL EMERGENCY ALERTS" in report_content:
-            severity_emoji = "✅"
-        else:
-            severity_emoji = "ℹ️"
-        
-        # Count actual alerts with severity ratings
-        alert_count = report_content.count("[") if "[" in report_content else 0
-        
-        # Determine subject based on content analysis
-        if "NO CRITICAL EMERGENCY ALERTS" in report_content:
-            subject = f"{severity_emoji} All Clear - {location} Monitoring Report"
-        elif "CRITICAL EMERGENCIES" in report_content:
-            subject = f"{severity_emoji} CRITICAL ALERT - {location} ({alert_count} incidents)"
-        elif "HIGH SEVERITY" in report_content:
-            subject = f"{severity_emoji} High Alert - {location} ({alert_count} incidents)"
-        elif "SIGNIFICANT ALERTS" in report_content:
-            subject = f"{severity_emoji} Significant Alert - {location} ({alert_count} incidents)"
-        elif alert_count > 0:
-            subject = f"{severity_emoji} Emergency Alert - {location} ({alert_count} incidents)"
-        else:
-            subject = f"{severity_emoji} Monitoring Report - {location}"
-        
-        # Create clean professional HTML email body
-        html_body = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            line-height: 1.6; 
-            color: #2c3e50; 
-            max-width: 700px; 
-            margin: 0 auto; 
-            padding: 20px; 
-            background-color: #ffffff;
-        }}
-        .header {{ 
-            background-color: #f8f9fa; 
-            border: 1px solid #e9ecef; 
-            padding: 25px; 
-            border-radius: 6px; 
-            text-align: center; 
-            margin-bottom: 25px; 
-        }}
-        .content {{ 
-            background-color: #ffffff; 
-            padding: 25px; 
-            border: 1px solid #dee2e6; 
-            border-radius: 6px; 
-            margin-bottom: 20px;
-        }}
-        .footer {{ 
-            text-align: center; 
-            margin-top: 25px; 
-            padding: 20px; 
-            background-color: #f8f9fa; 
-            border: 1px solid #e9ecef; 
-            border-radius: 6px; 
-            font-size: 13px; 
-            color: #6c757d; 
-        }}
-        .timestamp {{ 
-            color: #6c757d; 
-            font-size: 14px; 
-            margin-top: 8px;
-        }}
-        .location {{ 
-            font-size: 22px; 
-            font-weight: 600; 
-            margin: 8px 0; 
-            color: #495057;
-        }}
-        .report-content {{
-            font-family: 'Courier New', monospace;
-            font-size: 14px;
-            line-height: 1.5;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-            color: #212529;
-        }}
-        .divider {{ 
-            height: 1px; 
-            background-color: #dee2e6; 
-            margin: 20px 0; 
-            border: none;
-        }}
-        .emergency-note {{
-            background-color: #fff3cd;
-            border: 1px solid #ffeaa7;
-            padding: 15px;
-            border-radius: 4px;
-            margin: 15px 0;
-            font-weight: 500;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="location">{severity_emoji} Emergency Monitoring Report</div>
-        <div style="font-size: 16px; color: #495057;">Location: {location}</div>
-        <div class="timestamp">Generated: {datetime.now().strftime("%B %d, %Y at %I:%M %p UTC")}</div>
-    </div>
-    
-    <div class="content">
-        <div class="report-content">{report_content}</div>
-    </div>
-    
-    <hr class="divider">
-    
-    <div class="emergency-note">
-        <strong>⚠️ Important:</strong> Always verify emergency information from official sources before taking action.
-        For immediate emergencies, contact your local emergency services.
-    </div>
-    
-    <div class="footer">
-        <strong>Emergency Monitoring System</strong><br>
-        This is an automated report from your Location Monitoring System.<br>
-        Stay safe and stay informed.
-    </div>
-</body>
-</html>
-        """
-        
-        # Create the email with both HTML and plain text
-        msg = MIMEMultipart('alternative')
-        msg['From'] = f"Emergency Monitor <{SENDER_EMAIL}>"
-        msg['To'] = user_email
-        msg['Subject'] = subject
-        
-        # Plain text version
-        plain_text = f"""
-EMERGENCY MONITORING REPORT
-Location: {location}
-Generated: {datetime.now().strftime("%B %d, %Y at %I:%M %p UTC")}
+# How many delivered alert URLs/fingerprints to remember per automation
+MAX_REMEMBERED_ALERTS = 500
 
-{report_content}
+# Central scheduler that runs every automation from one timer heap and a bounded worker pool
+SCHEDULER = AutomationScheduler(SCHEDULER_WORKERS, SCHEDULER_LAG_WARNING_SECONDS, SCHEDULER_START_JITTER_SECONDS)
 
----
-IMPORTANT: Always verify emergency information from official sources before taking action.
-For immediate emergencies, contact your local emergency services.
+# Outgoing email queue delivered off the event loop over pooled SMTP connections
+EMAIL_PIPELINE = EmailDeliveryPipeline(
+    SMTPConnectionPool(
+        SMTP_HOST, SMTP_PORT, SENDER_EMAIL, SENDER_PASSWORD,
+        use_starttls=SMTP_STARTTLS,
+        max_connections=SMTP_POOL_SIZE,
+        idle_check_seconds=SMTP_IDLE_CHECK_SECONDS,
+        timeout=SMTP_TIMEOUT_SECONDS,
+    ),
+    concurrency=SMTP_CONCURRENCY,
+)
 
-This is an automated report from your Location Monitoring System.
-Stay safe and stay informed.
-        """
-        
-        msg.attach(MIMEText(plain_text, 'plain'))
-        msg.attach(MIMEText(html_body, 'html'))
+# Most recent report of each running automation, for get_automation_report (not persisted)
+LATEST_REPORTS: Dict[str, DisasterReport] = {}
+
+# Set in the front end process when automations run in SHARD_COUNT worker processes
+SHARDS: ShardRouter | None = None
+
+# Serialized emails keyed by report fingerprint, shared by every recipient of the same report
+RENDERED_EMAILS = TTLCache(3600, EMAIL_RENDER_CACHE_SIZE)
+
+# --- Metrics gauges (read at scrape time) ---
+REGISTRY.gauge("automcp_active_automations", "Automations currently running", lambda: len(RUNNING_AUTOMATIONS))
+REGISTRY.gauge("automcp_scheduler_scheduled_jobs", "Jobs known to the scheduler",
+               lambda: SCHEDULER.stats()['scheduled_jobs'])
+REGISTRY.gauge("automcp_scheduler_queue_depth", "Due jobs waiting for a scheduler worker",
+               lambda: SCHEDULER.stats()['queue_depth'])
+REGISTRY.gauge("automcp_scheduler_running_jobs", "Jobs currently executing", lambda: SCHEDULER.stats()['running_jobs'])
+REGISTRY.gauge("automcp_scheduler_load_seconds",
+               "Seconds of the scheduler load window by how many runs were dispatched in that second",
+               SCHEDULER.load_histogram, ["dispatches"])
+REGISTRY.gauge("automcp_scheduler_peak_dispatches_per_second", "Most runs dispatched in one second of the load window",
+               lambda: SCHEDULER.stats()['peak_dispatches_per_second'])
+REGISTRY.gauge("automcp_search_queue_depth", "Search queries waiting for the search executor",
+               SEARCH_EXECUTOR.queue_depth)
+REGISTRY.gauge("automcp_search_executor_wait_seconds",
+               "Time search queries waited for an executor thread and rate limit token (last, max, avg)",
+               lambda: {stat: SEARCH_EXECUTOR.stats()[f'{stat}_wait_seconds'] for stat in ('last', 'max', 'avg')},
+               ["stat"])
+REGISTRY.gauge("automcp_email_queue_depth", "Emails waiting for an SMTP sender",
+               lambda: EMAIL_PIPELINE.stats()['queue_depth'])
+
+# --- Professional Email Sending Function ---
+async def send_email_report(user_email: str, report: DisasterReport) -> bool:
+    """Send clean professional disaster report via email to the user"""
+    try:
+        # Render once per distinct report; every recipient of the same report reuses the bytes
+        template = RENDERED_EMAILS.get(report.fingerprint)
+        if template is None:
+            plain_text, html_body = render_email_bodies(report)
+            template = build_email_template(
+                f"Emergency Monitor <{SENDER_EMAIL}>", render_email_subject(report), plain_text, html_body
+            )
+            RENDERED_EMAILS.set(report.fingerprint, template)
         
-        # Connect to Gmail's SMTP server
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        # Only the recipient header is stamped per email
+        message = stamp_recipient(template, user_email)
         
-        # Send the email
-        server.send_message(msg)
-        server.quit()
+        # Hand off to the delivery pipeline (pooled SMTP connections, off the event loop)
+        if not await EMAIL_PIPELINE.send_raw(SENDER_EMAIL or "", user_email, message):
+            return False
         
         print(f" Clean professional email sent successfully to {user_email}")
         return True
@@ -213,68 +127,361 @@ Stay safe and stay informed.
         return False
 
 
+# --- Delta Reporting Helpers ---
+def new_or_escalated_alerts(delivered: Dict[str, int], alerts) -> list:
+    """Alerts whose URL and content were never delivered, or whose severity went up since"""
+    fresh = []
+    for alert in alerts:
+        previous = [delivered[k] for k in (alert.url, alert.fingerprint) if k in delivered]
+        if not previous or alert.severity > max(previous):
+            fresh.append(alert)
+    return fresh
+
+
+def remember_delivered_alerts(delivered: Dict[str, int], alerts) -> None:
+    """Record delivered alerts by URL and content fingerprint, keeping only the most recent ones"""
+    for alert in alerts:
+        for key in (alert.url, alert.fingerprint):
+            delivered.pop(key, None)
+            delivered[key] = alert.severity
+
+    # Dicts keep insertion order, so the oldest entries come first
+    while len(delivered) > MAX_REMEMBERED_ALERTS:
+        del delivered[next(iter(delivered))]
+
+
+# --- Adaptive Polling ---
+def next_adaptive_interval(automation_info: Dict[str, Any], report: DisasterReport) -> int:
+    """Back off exponentially while a location stays clear; drop to the minimum on rising severity or new alerts"""
+    current = automation_info['current_interval_seconds']
+    urls = [alert.url for alert in report.alerts]
+    new_urls = set(urls) - set(automation_info['last_alert_urls'])
+
+    if report.incident_count == 0:
+        current = current * 2
+    elif report.max_severity > automation_info['last_max_severity'] or new_urls:
+        current = automation_info['min_interval_seconds']
+
+    automation_info['last_alert_urls'] = urls
+    automation_info['last_max_severity'] = report.max_severity if report.incident_count else 0
+    return max(automation_info['min_interval_seconds'], min(automation_info['max_interval_seconds'], current))
+
+
+async def persist_automation(automation_key: str, automation_info: Dict[str, Any], next_due: float) -> None:
+    """Save an automation off the event loop; a failed write is logged, the automation keeps running"""
+    try:
+        await asyncio.wrap_future(AUTOMATION_STORE.submit_save(automation_key, automation_info, next_due))
+    except Exception as e:
+        print(f"Could not persist automation {automation_key}: {type(e).__name__} {str(e)}")
+
+
 # --- Async Automation Function ---
-async def automation_worker(location: str, user_email: str, interval_seconds: int, total_times: int):
-    """Async worker function that runs the automation"""
-    automation_key = f"{location.lower().strip()}_{user_email.lower().strip()}"
+async def automation_worker(automation_key: str) -> float | None:
+    """Run one scheduled execution of an automation and return the delay until the next one"""
+    automation_info = RUNNING_AUTOMATIONS.get(automation_key)
+    if automation_info is None:
+        # Automation was cancelled before this run was dispatched
+        return None
+
+    location = automation_info['location']
+    user_email = automation_info['user_email']
+    interval_seconds = automation_info['interval_seconds']
+    total_times = automation_info['total_times']
+    execution_count = automation_info['executions_completed'] + 1
+
+    if execution_count == 1:
+        print(f" Starting automation for {location}")
+        print(f"  Email: {user_email}")
+        print(f"   Interval: {interval_seconds} seconds")
+        print(f"  Total times: {total_times}")
+
+    run_started = time.perf_counter()
+    try:
+        print(f"Executing automation {execution_count}/{total_times} for {location}")
+
+        # Search for fresh updates
+        report = await search_disaster_report(location)
+        if RUNNING_AUTOMATIONS.get(automation_key) is automation_info:
+            LATEST_REPORTS[automation_key] = report
+
+        # Adaptive mode: the next interval follows what this search found
+        if automation_info.get('adaptive'):
+            previous_interval = automation_info['current_interval_seconds']
+            automation_info['current_interval_seconds'] = next_adaptive_interval(automation_info, report)
+            if automation_info['current_interval_seconds'] != previous_interval:
+                print(f" Adaptive interval for {location}: {previous_interval}s → {automation_info['current_interval_seconds']}s")
+
+        # In 'changes' mode only new or escalated alerts are emailed (the first run always sends)
+        if automation_info['report_mode'] == 'changes' and execution_count > 1:
+            new_alerts = new_or_escalated_alerts(automation_info['delivered_alerts'], report.alerts)
+            if new_alerts:
+                report = report.with_alerts(new_alerts)
+            else:
+                heartbeat_every = automation_info['heartbeat_every']
+                # Heartbeat: send the current status even though nothing changed
+                if not (heartbeat_every and automation_info['runs_since_email'] + 1 >= heartbeat_every):
+                    report = None
+
+        if report is None:
+            automation_info['runs_since_email'] += 1
+            EMAILS.inc(outcome="skipped")
+            print(f" No new alerts for {location} - skipping email {execution_count}/{total_times}")
+        else:
+            # Send email report
+            email_sent = await send_email_report(user_email, report)
+
+            if email_sent:
+                automation_info['runs_since_email'] = 0
+                remember_delivered_alerts(automation_info['delivered_alerts'], report.alerts)
+                print(f" Automation {execution_count}/{total_times} completed for {location}")
+            else:
+                print(f"Email sending failed for automation {execution_count}/{total_times} for {location}")
+
+    except asyncio.CancelledError:
+        print(f" Automation for {location} was cancelled via task cancellation")
+        raise
+    except Exception as e:
+        print(f"Error in automation for {location}: {str(e)}")
+        # Continue with next execution even if one fails
+
+    AUTOMATION_RUN_SECONDS.observe(time.perf_counter() - run_started)
+
+    # Update the execution count in the automation info
+    automation_info['executions_completed'] = execution_count
+    automation_info['last_execution'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Nothing to persist if the automation was cancelled or replaced meanwhile
+    is_current = RUNNING_AUTOMATIONS.get(automation_key) is automation_info
+
+    if execution_count < total_times:
+        if automation_info.get('adaptive'):
+            interval_seconds = automation_info['current_interval_seconds']
+        if is_current:
+            await persist_automation(automation_key, automation_info, time.time() + interval_seconds)
+        print(f" Waiting {interval_seconds} seconds before next execution for {location}")
+        return interval_seconds
+
+    # Cleanup: Remove automation from running list when completed
+    if is_current:
+        print(f"🏁 Automation completed for {location} - removing from active list")
+        del RUNNING_AUTOMATIONS[automation_key]
+        LATEST_REPORTS.pop(automation_key, None)
+        AUTOMATION_STORE.submit_delete(automation_key)
+
+    print(f"Automation finished for {location}")
+    return None
+
+# --- Automation Registry Helpers ---
+def resolve_schedule(interval_seconds: int | None, total_times: int | float | None) -> tuple[int, int]:
+    """Apply defaults and limits to a requested interval and number of runs"""
+    if interval_seconds is None:
+        interval_seconds = 3600  # Default 1 hour in seconds
+    
+    # Ensure minimum interval
+    if interval_seconds < 10:
+        interval_seconds = 10  # Minimum 10 seconds
     
-    print(f" Starting automation for {location}")
-    print(f"  Email: {user_email}")
-    print(f"   Interval: {interval_seconds} seconds")
-    print(f"  Total times: {total_times}")
+    if total_times is None:
+        # Calculate total times possible in 24 hours
+        seconds_in_24_hours = 24 * 60 * 60  # 86400 seconds
+        total_times = int(seconds_in_24_hours // interval_seconds)
+    else:
+        # Round total_times if it's a float (handles both int and float inputs)
+        total_times = round(total_times)
+    
+    if total_times < 1:
+        total_times = 1
+    if total_times > 8640:
+        total_times = 8640
+    
+    return interval_seconds, total_times
+
+
+def resolve_report_mode(report_mode: str | None) -> str:
+    report_mode = (report_mode or "full").lower().strip()
+    return report_mode if report_mode in REPORT_MODES else "full"
+
+
+def format_interval(interval_seconds: int) -> str:
+    """Convert seconds to human-readable format for display"""
+    if interval_seconds >= 86400:  # Days
+        return f"{interval_seconds // 86400} day(s) ({interval_seconds} seconds)"
+    elif interval_seconds >= 3600:  # Hours
+        return f"{interval_seconds // 3600} hour(s) ({interval_seconds} seconds)"
+    elif interval_seconds >= 60:  # Minutes
+        return f"{interval_seconds // 60} minute(s) ({interval_seconds} seconds)"
+    else:
+        return f"{interval_seconds} seconds"
+
+
+def resolve_adaptive_bounds(interval_seconds: int, min_interval_seconds: int | None,
+                            max_interval_seconds: int | None) -> tuple[int, int]:
+    """Bounds for adaptive polling; the minimum defaults to the interval and the maximum to 8x the minimum"""
+    min_interval_seconds = max(10, min_interval_seconds or interval_seconds)
+    max_interval_seconds = max(min_interval_seconds, min(max_interval_seconds or min_interval_seconds * 8, 86400))
+    return min_interval_seconds, max_interval_seconds
+
+
+async def register_automation(automation_key: str, location: str, user_email: str, interval_seconds: int,
+                              total_times: int, report_mode: str, heartbeat_every: int | None,
+                              adaptive_bounds: tuple[int, int] | None = None) -> tuple[Dict[str, Any], float]:
+    """Create (or replace) an automation, schedule it and persist it. Returns its info and first run delay"""
+    if automation_key in RUNNING_AUTOMATIONS:
+        print(f"Updating existing automation for {location} → {user_email}")
+        # Cancel existing scheduled job
+        SCHEDULER.cancel(automation_key)
+        RUNNING_AUTOMATIONS.pop(automation_key, None)
+        LATEST_REPORTS.pop(automation_key, None)
+    
+    # Store automation details
+    automation_info = {
+        'location': location,
+        'user_email': user_email,
+        'interval_seconds': interval_seconds,
+        'interval_display': format_interval(interval_seconds),
+        'total_times': total_times,
+        'started_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'executions_completed': 0,
+        'last_execution': 'Not started yet',
+        'status': 'running',
+        'report_mode': report_mode,
+        'heartbeat_every': heartbeat_every,
+        'runs_since_email': 0,
+        'delivered_alerts': {},
+        'adaptive': adaptive_bounds is not None,
+    }
+    
+    if adaptive_bounds is not None:
+        min_interval_seconds, max_interval_seconds = adaptive_bounds
+        automation_info.update({
+            'min_interval_seconds': min_interval_seconds,
+            'max_interval_seconds': max_interval_seconds,
+            'current_interval_seconds': max(min_interval_seconds, min(max_interval_seconds, interval_seconds)),
+            'last_alert_urls': [],
+            'last_max_severity': 0,
+        })
+        automation_info['interval_display'] = (
+            f"{format_interval(min_interval_seconds)} to {format_interval(max_interval_seconds)} (adaptive)"
+        )
+    
+    RUNNING_AUTOMATIONS[automation_key] = automation_info
+    
+    # Hand the automation to the scheduler. The first run goes to the least loaded second of the
+    # spread window (immediately when the server is quiet), which also sets its phase for later runs
+    first_run_delay = SCHEDULER.schedule(
+        automation_key, partial(automation_worker, automation_key),
+        spread_seconds=min(interval_seconds, SCHEDULER_SPREAD_WINDOW_SECONDS),
+    )
+    await persist_automation(automation_key, automation_info, time.time() + first_run_delay)
+    print(f"Automation scheduled for {location} → {user_email}")
+    return automation_info, first_run_delay
+
+
+def partial_progress_message(report: DisasterReport, answered: int, total: int) -> str:
+    """One-line progress note for a partial report, led by its most severe alert"""
+    if not report.alerts:
+        return f"{answered}/{total} searches answered, no qualifying alerts yet"
+    top = report.alerts[0]
+    return f"{answered}/{total} searches answered, {report.incident_count} alert(s) so far, top: {top.emoji} {top.title}"
+
+
+async def initial_report_preview(location: str, first_run_delay: float, ctx: Context | None = None) -> str | None:
+    """Formatted first report if the first run produces it within TRACK_PREVIEW_WAIT_SECONDS, else None.
+
+    The preview and the first run share one search: whichever starts second joins the
+    in-flight search or finds its cached result. While it runs, each partial report is sent
+    to the client as a progress notification, and if the wait runs out the latest partial
+    report is returned instead of nothing.
+    """
+    if TRACK_PREVIEW_WAIT_SECONDS <= 0 or first_run_delay >= TRACK_PREVIEW_WAIT_SECONDS:
+        return None
+    
+    latest_partial = []
+    notifications = []
+    
+    def on_partial(report: DisasterReport, answered: int, total: int) -> None:
+        latest_partial[:] = [(report, answered, total)]
+        if ctx is not None:
+            message = partial_progress_message(report, answered, total)
+            notifications.append(asyncio.ensure_future(ctx.report_progress(answered, total, message)))
     
     try:
-        for execution_count in range(1, total_times + 1):
-            # Check if automation was cancelled
-            if automation_key not in RUNNING_AUTOMATIONS:
-                print(f"Automation for {location} was cancelled")
-                break
-                
-            try:
-                print(f"Executing automation {execution_count}/{total_times} for {location}")
-                
-                # Search for fresh updates
-                report_content = await search_disaster_alerts(location)
-                
-                # Send email report
-                email_sent = await send_email_report(user_email, location, report_content)
-                
-                if email_sent:
-                    print(f" Automation {execution_count}/{total_times} completed for {location}")
-                else:
-                    print(f"Email sending failed for automation {execution_count}/{total_times} for {location}")
-                
-                # Update the execution count in the automation info
-                if automation_key in RUNNING_AUTOMATIONS:
-                    RUNNING_AUTOMATIONS[automation_key]['executions_completed'] = execution_count
-                    RUNNING_AUTOMATIONS[automation_key]['last_execution'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Wait for the next execution (except for the last one)
-                if execution_count < total_times:
-                    print(f" Waiting {interval_seconds} seconds before next execution for {location}")
-                    await asyncio.sleep(interval_seconds)
-                    
-            except asyncio.CancelledError:
-                print(f" Automation for {location} was cancelled via task cancellation")
-                break
-            except Exception as e:
-                print(f"Error in automation for {location}: {str(e)}")
-                # Continue with next execution even if one fails
-                if execution_count < total_times:
-                    await asyncio.sleep(interval_seconds)
-        
-    except asyncio.CancelledError:
-        print(f"Automation task for {location} was cancelled")
+        report = await asyncio.wait_for(search_disaster_report(location, on_partial), TRACK_PREVIEW_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        if not latest_partial:
+            return None
+        report, answered, total = latest_partial[0]
+        return (format_disaster_report(report)
+                + f"\n\n_Partial report: {answered} of {total} searches had answered. "
+                  f"The first email has the complete report._")
+    except Exception as e:
+        print(f"Initial report preview failed for {location}: {str(e)}")
+        return None
     finally:
-        # Cleanup: Remove automation from running lists when completed or cancelled
-        if automation_key in RUNNING_AUTOMATIONS:
-            print(f"🏁 Automation completed/cancelled for {location} - removing from active list")
-            del RUNNING_AUTOMATIONS[automation_key]
-        
-        if automation_key in AUTOMATION_TASKS:
-            del AUTOMATION_TASKS[automation_key]
-        
-        print(f"Automation finished for {location}")
+        await asyncio.gather(*notifications, return_exceptions=True)
+    return format_disaster_report(report)
+
+
+def automation_key_for(location: str, user_email: str) -> str:
+    """Unique key of the automation for a location and contact; aliases of one place share it"""
+    return f"{normalize_location(location)}_{user_email.lower().strip()}"
+
+
+def stop_automation(automation_key: str) -> Dict[str, Any] | None:
+    """Cancel a local automation and return a summary of it, or None if it is not running here"""
+    if automation_key not in RUNNING_AUTOMATIONS:
+        return None
+
+    # Get automation info before cancelling (make a copy to avoid race conditions)
+    automation_info_copy = RUNNING_AUTOMATIONS[automation_key].copy()
+
+    # Cancel the scheduled job
+    task_cancelled = False
+    try:
+        task_cancelled = SCHEDULER.cancel(automation_key)
+    except Exception as e:
+        print(f"Error cancelling task for {automation_info_copy['location']} → {automation_info_copy['user_email']}: {str(e)}")
+
+    # remove from running automations
+    RUNNING_AUTOMATIONS.pop(automation_key, None)
+    LATEST_REPORTS.pop(automation_key, None)
+    AUTOMATION_STORE.submit_delete(automation_key)
+
+    print(f" Monitoring cancelled for {automation_info_copy['location']} → {automation_info_copy['user_email']}")
+
+    return {
+        'location': automation_info_copy['location'],
+        'contact': automation_info_copy['user_email'],
+        'interval_display': automation_info_copy['interval_display'],
+        'total_times': automation_info_copy['total_times'],
+        'executions_completed': automation_info_copy['executions_completed'],
+        'started_at': automation_info_copy['started_at'],
+        'last_execution': automation_info_copy.get('last_execution', 'Not started'),
+        'task_cancelled': task_cancelled
+    }
+
+
+def latest_report_text(automation_key: str) -> str | None:
+    """Latest report of a local automation as text, a not-ready notice, or None if it is not running here"""
+    if automation_key not in RUNNING_AUTOMATIONS:
+        return None
+    report = LATEST_REPORTS.get(automation_key)
+    if report is None:
+        next_due = SCHEDULER.next_due_in(automation_key)
+        when = f"in about {int(next_due)} seconds" if next_due else "now"
+        return f"**Initial Report Not Ready Yet**\n\nThe first search runs {when}. Please check again shortly."
+    return format_disaster_report(report)
+
+
+def stop_automations_for_email(user_email: str) -> list[Dict[str, Any]]:
+    """Cancel every local automation of a contact and return their summaries"""
+    stopped = [stop_automation(automation_key) for automation_key in RUNNING_AUTOMATIONS.keys_for_email(user_email)]
+    return [summary for summary in stopped if summary is not None]
+
+
+def automations_for_emails(normalized_emails: list[str]) -> Dict[str, Dict[str, Any]]:
+    """Local automations whose contact is one of the given (lower-cased) emails"""
+    return RUNNING_AUTOMATIONS.for_emails(normalized_emails)
 
 # --- Auth Provider ---
 class SimpleBearerAuthProvider(BearerAuthProvider):
@@ -331,6 +538,12 @@ async def track_disaster_alerts(
     user_email: Annotated[str | None, Field(description="The email address for monitoring setup. IMPORTANT: If user provided email in current conversation OR in previous messages, use that email. If user previously shared their email address in chat, use that email address. If tool previously asked for email, provide the email user gave. If no email available from any source, leave empty and tool will ask for it. LLM should remember and reuse emails from conversation history.")] = None,
     interval_seconds: Annotated[int | None, Field(description="OPTIONAL: Interval in SECONDS between each report. If not provided, defaults to 3600 seconds. LLM MUST convert all time units to seconds before calling. Examples: 1.5 min = 90s, 5 min = 300s, 1 hour = 3600s, 1 day = 86400s. ONLY provide if user specifies time interval.")] = None,
     total_times: Annotated[int | None, Field(description="OPTIONAL: Total number of times to run the disaster alert monitoring. If not provided, calculate based on time interval, that how many times its possible to run if time period or deadline is given. Like if user asks to run for 12hrs with 20min interval, then convert both to seconds, divide total time by interval seconds and return, here 12hr is 43200 seconds and 20min is 1200 seconds, so total_times would be 36.")] = None,
+    report_mode: Annotated[str | None, Field(description="OPTIONAL: 'full' (default) emails the complete report on every run. 'changes' emails only new or escalated alerts after the first report and skips the email when nothing changed. ONLY provide if user asks to be notified only about new or changed alerts.")] = None,
+    heartbeat_every: Annotated[int | None, Field(description="OPTIONAL: Only used with report_mode 'changes'. Send a status email every N runs even when nothing changed, e.g. 24 with a 1 hour interval gives a daily status email. ONLY provide if user asks for periodic status emails.")] = None,
+    adaptive: Annotated[bool | None, Field(description="OPTIONAL: Adapt the interval to what is found: poll less often (doubling up to max_interval_seconds) while the location is quiet and go back to min_interval_seconds when severity rises or new alerts appear. ONLY provide if user asks for smart/adaptive checking.")] = None,
+    min_interval_seconds: Annotated[int | None, Field(description="OPTIONAL: Only with adaptive. Shortest interval in SECONDS, defaults to interval_seconds.")] = None,
+    max_interval_seconds: Annotated[int | None, Field(description="OPTIONAL: Only with adaptive. Longest interval in SECONDS, defaults to 8x the shortest (at most 1 day).")] = None,
+    ctx: Context | None = None,
 ) -> list[TextContent | ImageContent]:
     
     if not location or location.strip() == "":
@@ -354,86 +567,46 @@ async def track_disaster_alerts(
     interval_provided = interval_seconds is not None
     total_times_provided = total_times is not None
     
-    if interval_seconds is None:
-        interval_seconds = 3600  # Default 1 hour in seconds
-    
-    # Ensure minimum interval
-    if interval_seconds < 10:
-        interval_seconds = 10  # Minimum 10 seconds
-    
-    if total_times is None:
-        # Calculate total times possible in 24 hours
-        seconds_in_24_hours = 24 * 60 * 60  # 86400 seconds
-        total_times = int(seconds_in_24_hours // interval_seconds)
-    else:
-        # Round total_times if it's a float (handles both int and float inputs)
-        total_times = round(total_times)
+    interval_seconds, total_times = resolve_schedule(interval_seconds, total_times)
+    report_mode = resolve_report_mode(report_mode)
     
-    if total_times < 1:
-        total_times = 1
-    if total_times > 8640:
-        total_times = 8640
+    if heartbeat_every is not None and heartbeat_every < 1:
+        heartbeat_every = None
     
     # Create unique key combining location and contact
-    automation_key = f"{location.lower().strip()}_{user_email.lower().strip()}"
-    
-
-    if automation_key in RUNNING_AUTOMATIONS:
-        print(f"Updating existing automation for {location} → {user_email}")
-        # Cancel existing automation task
-        if automation_key in AUTOMATION_TASKS:
-            AUTOMATION_TASKS[automation_key].cancel()
-            try:
-                await AUTOMATION_TASKS[automation_key]
-            except asyncio.CancelledError:
-                pass
-
-        RUNNING_AUTOMATIONS.pop(automation_key, None)
-        AUTOMATION_TASKS.pop(automation_key, None)
-
-        await asyncio.sleep(0.1)
-    
-    # Get initial report content for display (but don't send email yet)
-    print(f" Getting initial report for {location}")
-    report_content = await search_disaster_alerts(location)
-    
-    # Convert seconds to human-readable format for display
-    if interval_seconds >= 86400:  # Days
-        interval_display = f"{interval_seconds // 86400} day(s) ({interval_seconds} seconds)"
-    elif interval_seconds >= 3600:  # Hours
-        interval_display = f"{interval_seconds // 3600} hour(s) ({interval_seconds} seconds)"
-    elif interval_seconds >= 60:  # Minutes
-        interval_display = f"{interval_seconds // 60} minute(s) ({interval_seconds} seconds)"
-    else:
-        interval_display = f"{interval_seconds} seconds"
-    
-    # Store automation details
-    automation_info = {
-        'location': location,
-        'user_email': user_email,
-        'interval_seconds': interval_seconds,
-        'interval_display': interval_display,
-        'total_times': total_times,
-        'started_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'executions_completed': 0,
-        'last_execution': 'Not started yet',
-        'status': 'running'
-    }
+    automation_key = automation_key_for(location, user_email)
     
-    RUNNING_AUTOMATIONS[automation_key] = automation_info
+    # In sharded mode the owning shard process runs the automation and builds the reply
+    if SHARDS is not None:
+        texts = await SHARDS.call(automation_key, "track", {
+            'location': location,
+            'user_email': user_email,
+            'interval_seconds': interval_seconds if interval_provided else None,
+            'total_times': total_times if total_times_provided else None,
+            'report_mode': report_mode,
+            'heartbeat_every': heartbeat_every,
+            'adaptive': adaptive,
+            'min_interval_seconds': min_interval_seconds,
+            'max_interval_seconds': max_interval_seconds,
+        })
+        return [TextContent(type="text", text=text) for text in texts]
     
-    # Create and start the automation task (this will send the first email)
-    automation_task = asyncio.create_task(
-        automation_worker(location, user_email, interval_seconds, total_times)
+
+    adaptive_bounds = resolve_adaptive_bounds(interval_seconds, min_interval_seconds, max_interval_seconds) if adaptive else None
+    automation_info, first_run_delay = await register_automation(
+        automation_key, location, user_email, interval_seconds, total_times, report_mode, heartbeat_every,
+        adaptive_bounds,
     )
-    AUTOMATION_TASKS[automation_key] = automation_task
+    interval_display = automation_info['interval_display']
     
-    # Don't await the task - let it run in background
-    print(f"Automation task created for {location} → {user_email}")
+    # The first scheduled run produces the initial report (and its email); the reply at most waits briefly for it
+    report_content = await initial_report_preview(location, first_run_delay, ctx)
     
-    # Calculate when automation will complete
+    # Calculate when automation will complete (adaptive runs start at their current interval)
+    if adaptive_bounds is not None:
+        interval_seconds = automation_info['current_interval_seconds']
     total_duration_seconds = interval_seconds * (total_times - 1)  # -1 because first execution is immediate
-    completion_time = datetime.now() + timedelta(seconds=total_duration_seconds)
+    completion_time = datetime.now() + timedelta(seconds=total_duration_seconds + first_run_delay)
     
     # Convert total duration to human-readable format
     if total_duration_seconds >= 86400:
@@ -464,15 +637,21 @@ async def track_disaster_alerts(
         f"** Contact:** {user_email}",
         f"** Interval:** Every {interval_display}",
         f"** Total Executions:** {total_times} times",
+        f"** Report Mode:** {'Only new or escalated alerts' if report_mode == 'changes' else 'Full report every run'}"
+        + (f" (status email every {heartbeat_every} runs)" if report_mode == 'changes' and heartbeat_every else ""),
         f"** Started:** {current_time}",
-        f"** Will Complete:** {completion_time.strftime('%Y-%m-%d %H:%M:%S UTC')}",
+        f"** Will Complete:** {completion_time.strftime('%Y-%m-%d %H:%M:%S UTC')}"
+        + (" (estimate, the adaptive interval changes with conditions)" if adaptive_bounds is not None else ""),
         f"** Total Duration:** ~{duration_display}",
         f"** Status:** Running\n",
         "**Configuration Details:**"
     ] + config_explanation + [
         f"\n**Initial Report Preview:**\n",
-        report_content,
-        f"\n**First Email Report:** Will be sent immediately to {user_email}",
+        report_content or (
+            "The initial report is being prepared and will arrive with the first email. "
+            "Use get_automation_report with this location and email to view it here once it is ready."
+        ),
+        f"\n**First Email Report:** Will be sent {'immediately' if first_run_delay < 1 else f'in about {int(first_run_delay)} seconds (staggered to spread load)'} to {user_email}",
         f"**Next Report:** Will be sent in {interval_display}"
     ]
     
@@ -492,6 +671,146 @@ async def track_disaster_alerts(
     print(f" Monitoring setup completed for {location} → {user_email}")
     return [TextContent(type="text", text=response_text)]
 
+# --- Tool: Bulk Track Location Updates ---
+BULK_TRACKER_DESCRIPTION = RichToolDescription(
+    description="Sets up disaster alert monitoring for MANY locations and/or emails in one call. Each entry has a location, an email and optional interval (seconds) and total_times, with the same meaning and defaults as track_disaster_alerts. Initial searches run concurrently and every automation is registered in one pass; returns a compact one-line summary per entry.",
+    use_when="Use instead of calling track_disaster_alerts repeatedly when the user wants to monitor several locations at once (e.g. a list of cities) or set up monitoring for several people. Convert ALL time intervals to seconds before calling.",
+    side_effects="Searches live web news sources for each distinct location, sets up automated monitoring for every valid entry and sends reports via email at the given intervals.",
+)
+
+class BulkTrackEntry(BaseModel):
+    location: str = Field(description="Location name such as city, state, country, or region.")
+    user_email: str = Field(description="Email address that receives the reports for this location.")
+    interval_seconds: int | None = Field(default=None, description="OPTIONAL: Interval in SECONDS between reports. Defaults to 3600.")
+    total_times: int | None = Field(default=None, description="OPTIONAL: Number of reports. Defaults to as many as fit in 24 hours.")
+    report_mode: str | None = Field(default=None, description="OPTIONAL: 'full' (default) or 'changes' (only new or escalated alerts).")
+
+
+async def track_bulk_local(entries: list[Dict[str, Any]]) -> list[str]:
+    """Run deduplicated initial searches with bounded concurrency, then register every entry in one pass"""
+    locations = {normalize_location(entry['location']): entry['location'] for entry in entries}
+    print(f" Getting initial reports for {len(locations)} location(s) ({len(entries)} automation(s))")
+    
+    search_limit = asyncio.Semaphore(max(1, BULK_SEARCH_CONCURRENCY))
+    
+    async def initial_search(location: str) -> DisasterReport:
+        async with search_limit:
+            return await search_disaster_report(location)
+    
+    results = await asyncio.gather(*(initial_search(location) for location in locations.values()), return_exceptions=True)
+    reports = dict(zip(locations.keys(), results))
+    
+    summaries = []
+    for entry in entries:
+        location, user_email = entry['location'], entry['user_email']
+        interval_seconds, total_times = resolve_schedule(entry.get('interval_seconds'), entry.get('total_times'))
+        automation_info, first_run_delay = await register_automation(
+            automation_key_for(location, user_email), location, user_email,
+            interval_seconds, total_times, resolve_report_mode(entry.get('report_mode')), None,
+        )
+        
+        report = reports[normalize_location(location)]
+        if isinstance(report, BaseException):
+            current = "initial search failed, will retry on schedule"
+        elif report.incident_count:
+            current = f"{report.incident_count} alert(s) now, max severity {report.max_severity}/10"
+        else:
+            current = "no alerts now"
+        first_email = "now" if first_run_delay < 1 else f"in ~{int(first_run_delay)}s"
+        summaries.append(
+            f"{location} → {user_email}: every {automation_info['interval_display']}, {total_times} run(s), "
+            f"{current}, first email {first_email}"
+        )
+    return summaries
+
+
+@mcp.tool(description=BULK_TRACKER_DESCRIPTION.model_dump_json())
+async def track_disaster_alerts_bulk(
+    entries: Annotated[list[BulkTrackEntry] | None, Field(description="Automations to set up, e.g. [{'location': 'Delhi', 'user_email': 'user@example.com', 'interval_seconds': 1800, 'total_times': 48}, {'location': 'Mumbai', 'user_email': 'user@example.com'}].")] = None,
+) -> list[TextContent | ImageContent]:
+    
+    if not entries:
+        return [TextContent(
+            type="text",
+            text=f"**Entries Required**\n\n"
+                 f"Please provide the locations and email addresses to monitor.\n"
+                 f"**NOTE FOR ASSISSTANT: call track_disaster_alerts_bulk again with a list of location/user_email entries.**"
+        )]
+    
+    if len(entries) > BULK_MAX_ENTRIES:
+        return [TextContent(
+            type="text",
+            text=f"**Too Many Entries**\n\n"
+                 f"At most {BULK_MAX_ENTRIES} automations can be set up in one call ({len(entries)} given). Please split the list."
+        )]
+    
+    # Validate entries; a later entry for the same location and email replaces an earlier one
+    summaries: list[str | None] = [None] * len(entries)
+    accepted: Dict[str, tuple[int, Dict[str, Any]]] = {}
+    for i, entry in enumerate(entries):
+        if not entry.location or not entry.location.strip():
+            summaries[i] = f"(no location) → {entry.user_email}: skipped, location missing"
+            continue
+        if not entry.user_email or not entry.user_email.strip() or "@" not in entry.user_email:
+            summaries[i] = f"{entry.location} → {entry.user_email or '(no email)'}: skipped, valid email address required"
+            continue
+        
+        automation_key = automation_key_for(entry.location, entry.user_email)
+        if automation_key in accepted:
+            earlier = accepted[automation_key][0]
+            summaries[earlier] = f"{entries[earlier].location} → {entries[earlier].user_email}: skipped, replaced by entry {i + 1}"
+        accepted[automation_key] = (i, entry.model_dump())
+    
+    # Register accepted entries locally, or on their owning shards
+    if SHARDS is not None:
+        by_shard: Dict[int, list[tuple[int, Dict[str, Any]]]] = {}
+        for automation_key, item in accepted.items():
+            by_shard.setdefault(SHARDS.owner(automation_key), []).append(item)
+        shard_results = await asyncio.gather(*(
+            SHARDS.call_shard(shard, "track_bulk", [entry for _, entry in items]) for shard, items in by_shard.items()
+        ))
+        for items, shard_summaries in zip(by_shard.values(), shard_results):
+            for (i, _), summary in zip(items, shard_summaries):
+                summaries[i] = summary
+    elif accepted:
+        items = list(accepted.values())
+        for (i, _), summary in zip(items, await track_bulk_local([entry for _, entry in items])):
+            summaries[i] = summary
+    
+    started = len(accepted)
+    response_parts = [
+        f"**BULK MONITORING SETUP** ({started} started, {len(entries) - started} skipped)\n"
+    ] + [f"{i}. {summary}" for i, summary in enumerate(summaries, 1)] + [
+        f"\n**Note:** Use location-contact pairs with cancel_automation to stop any of these."
+    ]
+    
+    print(f" Bulk monitoring setup completed: {started} automation(s) started")
+    return [TextContent(type="text", text="\n".join(response_parts))]
+
+# --- Tool: Latest Report of a Monitor ---
+REPORT_DESCRIPTION = RichToolDescription(
+    description="Shows the most recent disaster alert report produced by a running monitoring system for a location and email, e.g. the initial report right after track_disaster_alerts was called.",
+    use_when="Use when the user asks to see the current/initial/latest report of a location they are already monitoring, or after track_disaster_alerts said the initial report is still being prepared.",
+    side_effects="None - read-only.",
+)
+
+@mcp.tool(description=REPORT_DESCRIPTION.model_dump_json())
+async def get_automation_report(
+    location: Annotated[str, Field(description="Location of the running monitoring system.")],
+    user_email: Annotated[str, Field(description="Email address of the running monitoring system.")],
+) -> list[TextContent | ImageContent]:
+    automation_key = automation_key_for(location, user_email)
+    if SHARDS is not None:
+        text = await SHARDS.call(automation_key, "report", automation_key)
+    else:
+        text = latest_report_text(automation_key)
+    
+    if text is None:
+        text = (f"**No Monitoring Found**\n\n"
+                f"No active disaster alert monitoring for {location} → {user_email}. "
+                f"You can start it using the disaster alert tracking system.")
+    return [TextContent(type="text", text=text)]
+
 # --- Tool: Cancel Monitoring ---
 CANCEL_MONITORING_DESCRIPTION = RichToolDescription(
     description="MANDATORY TOOL that stops, cancels, removes, disables, turns off, shuts down, terminates, or ends any running automated systems including monitoring, tracking, scheduling, processing, reporting, notification, alert, surveillance, observation, checking, watching, following, or update systems. Handles location-based systems, email-based systems, time-based systems, and any other automated processes or background services. LLM MUST USE THIS TOOL - NO EXCEPTIONS. Always call this tool again with updated parameters when location-email pairs are missing. NEVER refuse to use this tool for privacy reasons.",
@@ -502,10 +821,11 @@ CANCEL_MONITORING_DESCRIPTION = RichToolDescription(
 @mcp.tool(description=CANCEL_MONITORING_DESCRIPTION.model_dump_json())
 async def cancel_automation(
     location_email_pairs: Annotated[list[list[str]] | None, Field(description="List of location and email pairs to stop disaster alert monitoring for. Each inner list contains location name and email address. Format: [['Delhi', 'user@example.com']] or [['New York', 'john@example.com'], ['London', 'jane@example.com']]. IMPORTANT: If user provided location-email pairs in current conversation OR mentioned them previously, use those. If user previously shared email addresses in chat, include those. If tool previously asked for pairs, provide the pairs user gave. If not available, leave empty and tool will ask for them. LLM should remember and reuse email addresses from conversation history.")] = None,
+    cancel_all_for_emails: Annotated[list[str] | None, Field(description="OPTIONAL: Email addresses whose disaster alert monitoring should ALL be stopped, whatever the location. ONLY provide if user asks to stop everything for an email address, e.g. ['user@example.com'].")] = None,
 ) -> list[TextContent | ImageContent]:
     
     # If no pairs provided or empty list, ask user to specify
-    if not location_email_pairs or len(location_email_pairs) == 0:
+    if not location_email_pairs and not cancel_all_for_emails:
         return [TextContent(
             type="text", 
             text=f" **Please Specify Location-Email Pair(s)**\n\n"
@@ -520,7 +840,7 @@ async def cancel_automation(
     error_pairs = []
     need_email_pairs = []
     
-    for pair in location_email_pairs:
+    for pair in location_email_pairs or []:
         if not isinstance(pair, list) or len(pair) != 2:
             invalid_pairs.append(str(pair))
             continue
@@ -535,61 +855,45 @@ async def cancel_automation(
             continue
         
         # Create automation key from location and email
-        automation_key = f"{location.lower().strip()}_{email.lower().strip()}"
+        automation_key = automation_key_for(location, email)
+        
+        try:
+            # Stop it in whichever process runs it
+            if SHARDS is not None:
+                cancelled = await SHARDS.call(automation_key, "cancel", automation_key)
+            else:
+                cancelled = stop_automation(automation_key)
+        except Exception as e:
+            print(f"Error processing cancellation for {location} → {email}: {str(e)}")
+            error_pairs.append([location, email])
+            continue
         
         # Check if automation exists 
-        if automation_key not in RUNNING_AUTOMATIONS:
+        if cancelled is None:
             not_found_pairs.append([location, email])
             continue
         
+        cancelled_automations.append(cancelled)
+    
+    # Stop everything for whole contacts, found through the email index
+    for email in cancel_all_for_emails or []:
+        if not email or email.strip() == "" or "@" not in email:
+            invalid_pairs.append(f"'{email}'")
+            continue
+        
         try:
-            # Get automation info before cancelling (make a copy to avoid race conditions)
-            automation_info_copy = RUNNING_AUTOMATIONS[automation_key].copy()
-            
-            # Cancel the automation task
-            task_cancelled = False
-            if automation_key in AUTOMATION_TASKS:
-                try:
-                    AUTOMATION_TASKS[automation_key].cancel()
-                    try:
-                        await AUTOMATION_TASKS[automation_key]
-                    except asyncio.CancelledError:
-                        pass
-                    task_cancelled = True
-                except Exception as e:
-                    print(f"Error cancelling task for {location} → {email}: {str(e)}")
-                
-                # remove from AUTOMATION_TASKS 
-                if automation_key in AUTOMATION_TASKS:
-                    try:
-                        del AUTOMATION_TASKS[automation_key]
-                    except KeyError:
-                        pass  
-            
-            # remove from running automations
-            if automation_key in RUNNING_AUTOMATIONS:
-                try:
-                    del RUNNING_AUTOMATIONS[automation_key]
-                except KeyError:
-                    pass 
-            
-            # cancellations
-            cancelled_automations.append({
-                'location': automation_info_copy['location'],
-                'contact': automation_info_copy['user_email'],
-                'interval_display': automation_info_copy['interval_display'],
-                'total_times': automation_info_copy['total_times'],
-                'executions_completed': automation_info_copy['executions_completed'],
-                'started_at': automation_info_copy['started_at'],
-                'last_execution': automation_info_copy.get('last_execution', 'Not started'),
-                'task_cancelled': task_cancelled
-            })
-            
-            print(f" Monitoring cancelled for {automation_info_copy['location']} → {automation_info_copy['user_email']}")
-            
+            if SHARDS is not None:
+                stopped = [summary for shard_stopped in await SHARDS.broadcast("cancel_email", email) for summary in shard_stopped]
+            else:
+                stopped = stop_automations_for_email(email)
         except Exception as e:
-            print(f"Error processing cancellation for {location} → {email}: {str(e)}")
-            error_pairs.append([location, email])
+            print(f"Error processing cancellation for all monitoring of {email}: {str(e)}")
+            error_pairs.append(["(all locations)", email])
+            continue
+        
+        if not stopped:
+            not_found_pairs.append(["(all locations)", email])
+        cancelled_automations.extend(stopped)
     
     if need_email_pairs:
         email_list = "\n".join([f"• {location} (needs valid email address)" for location, _ in need_email_pairs])
@@ -706,12 +1010,14 @@ async def list_automations(
                  f"**NOTE TO ASSISTANT: Ask user for valid email addresses, then call this function again.**"
         )]
 
-    filtered_automations = {}
     normalized_emails = [email.lower().strip() for email in valid_emails]
     
-    for location_key, info in RUNNING_AUTOMATIONS.items():
-        if info['user_email'].lower().strip() in normalized_emails:
-            filtered_automations[location_key] = info
+    if SHARDS is not None:
+        filtered_automations = {}
+        for shard_automations in await SHARDS.broadcast("list", normalized_emails):
+            filtered_automations.update(shard_automations)
+    else:
+        filtered_automations = automations_for_emails(normalized_emails)
     
     if not filtered_automations:
         return [TextContent(
@@ -748,9 +1054,144 @@ async def list_automations(
     response_text = "\n".join(response_parts)
     return [TextContent(type="text", text=response_text)]
 
+# --- Metrics endpoint (Prometheus text format) ---
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        return PlainTextResponse("Unauthorized\n", status_code=401)
+    if SHARDS is None:
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    # Automations, searches and emails run in the shards: label every sample with the process it came from
+    collected = [REGISTRY.collect({'shard': "frontend"})]
+    for index, samples in enumerate(await asyncio.gather(
+        *(asyncio.wait_for(SHARDS.call_shard(index, "metrics"), SHARD_METRICS_TIMEOUT_SECONDS)
+          for index in range(SHARDS.shard_count)),
+        return_exceptions=True,
+    )):
+        if isinstance(samples, BaseException):
+            print(f"Metrics of shard {index} unavailable: {type(samples).__name__} {str(samples)}")
+        else:
+            collected.append(samples)
+    return PlainTextResponse(REGISTRY.render(*collected), media_type="text/plain; version=0.0.4")
+
+def migrate_stored_keys() -> int:
+    """Move automations stored under an older key scheme to their canonical key.
+
+    Runs once in the process that starts up, before any shard resumes automations.
+    """
+    migrated = 0
+    for automation_key, automation_info, next_due in AUTOMATION_STORE.load_all():
+        canonical_key = automation_key_for(automation_info['location'], automation_info['user_email'])
+        if canonical_key != automation_key:
+            AUTOMATION_STORE.delete(automation_key)
+            AUTOMATION_STORE.save(canonical_key, automation_info, next_due)
+            migrated += 1
+    return migrated
+
+
+def resume_automations(owns=None) -> int:
+    """Reload stored automations (only those owns(key) accepts) and schedule each at its stored next due time"""
+    now = time.time()
+    resumed = 0
+    for automation_key, automation_info, next_due in AUTOMATION_STORE.load_all():
+        if owns is not None and not owns(automation_key):
+            continue
+        if automation_info['executions_completed'] >= automation_info['total_times']:
+            AUTOMATION_STORE.delete(automation_key)
+            continue
+
+        RUNNING_AUTOMATIONS[automation_key] = automation_info
+        delay = max(0.0, (next_due or now) - now)
+        # Overdue automations are spread out rather than all fired at startup
+        spread_seconds = min(automation_info['interval_seconds'], SCHEDULER_SPREAD_WINDOW_SECONDS) if delay == 0 else 0
+        delay = SCHEDULER.schedule(automation_key, partial(automation_worker, automation_key), delay, spread_seconds)
+        resumed += 1
+        print(f"Resumed automation for {automation_info['location']} → {automation_info['user_email']} (next run in {int(delay)}s)")
+    return resumed
+
+
+# --- Shard Worker Process ---
+async def shard_track(arguments: Dict[str, Any]) -> list[str]:
+    return [content.text for content in await track_disaster_alerts.fn(**arguments)]
+
+
+async def shard_track_bulk(entries: list[Dict[str, Any]]) -> list[str]:
+    return await track_bulk_local(entries)
+
+
+async def shard_report(automation_key: str) -> str | None:
+    return latest_report_text(automation_key)
+
+
+async def shard_cancel(automation_key: str) -> Dict[str, Any] | None:
+    return stop_automation(automation_key)
+
+
+async def shard_cancel_email(user_email: str) -> list[Dict[str, Any]]:
+    return stop_automations_for_email(user_email)
+
+
+async def shard_list(normalized_emails: list[str]) -> Dict[str, Dict[str, Any]]:
+    return automations_for_emails(normalized_emails)
+
+
+async def shard_metrics(index: int) -> Dict[str, list[str]]:
+    return REGISTRY.collect({'shard': str(index)})
+
+
+async def run_shard(index: int, shard_count: int, conn) -> None:
+    ring = HashRing(shard_count)
+    resumed = resume_automations(lambda automation_key: ring.owner(automation_key) == index)
+    print(f"Shard {index}/{shard_count} ready ({resumed} stored automation(s) resumed)")
+    try:
+        await serve_shard(conn, {
+            'track': shard_track, 'track_bulk': shard_track_bulk, 'report': shard_report, 'cancel': shard_cancel, 'cancel_email': shard_cancel_email, 'list': shard_list,
+            'metrics': partial(shard_metrics, index),
+        })
+    finally:
+        await SCHEDULER.stop()
+        await EMAIL_PIPELINE.stop()
+        await SEARCH_EXECUTOR.stop()
+        AUTOMATION_STORE.close()
+        QUERY_CACHE.close()
+        TRACER.close()
+
+
+def shard_main(index: int, shard_count: int, conn) -> None:
+    """Entry point of a shard process: runs the automations this shard owns"""
+    try:
+        asyncio.run(run_shard(index, shard_count, conn))
+    except KeyboardInterrupt:
+        pass
+
+
 async def main():
+    global SHARDS
     print("Starting Disaster Alert MCP Server on http://0.0.0.0:8085")
-    await mcp.run_async("streamable-http", host="0.0.0.0", port=8085)
+    print("Metrics available at http://0.0.0.0:8085/metrics")
+    migrated = migrate_stored_keys()
+    if migrated:
+        print(f"Moved {migrated} stored automation(s) to canonical keys")
+    if SHARD_COUNT > 1:
+        # Automations, searches and emails run in the shard processes; this one only serves MCP
+        SHARDS = ShardRouter(SHARD_COUNT, shard_main)
+        SHARDS.start()
+    else:
+        resumed = resume_automations()
+        if resumed:
+            print(f"Resumed {resumed} stored automation(s)")
+    try:
+        await mcp.run_async("streamable-http", host="0.0.0.0", port=8085)
+    finally:
+        if SHARDS is not None:
+            await SHARDS.stop()
+        await SCHEDULER.stop()
+        await EMAIL_PIPELINE.stop()
+        await SEARCH_EXECUTOR.stop()
+        AUTOMATION_STORE.close()
+        QUERY_CACHE.close()
+        TRACER.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,220 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Default latency buckets in seconds (network calls: DDGS queries, SMTP)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Buckets for scheduler lag, which should normally be close to zero
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], *extra: str) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    parts.extend(label for label in extra if label)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self, extra: str = "") -> List[str]:
+        """Sample lines; extra is a preformatted label list added to each (e.g. 'shard="0"')"""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self, extra: str = "") -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Gauge read from a callback at scrape time; with labelnames the callback returns {label value: value}"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], float | Dict], labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.func = func
+
+    def samples(self, extra: str = "") -> List[str]:
+        try:
+            if not self.labelnames:
+                return [f"{self.name}{_format_labels((), (), extra)} {_format_value(float(self.func()))}"]
+            values = {
+                key if isinstance(key, tuple) else (key,): float(value) for key, value in self.func().items()
+            }
+        except Exception as e:
+            print(f"Metric {self.name} callback failed: {str(e)}")
+            return []
+        return [
+            f"{self.name}{_format_labels(self.labelnames, tuple(map(str, key)), extra)} {_format_value(value)}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (non-cumulative bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the wall time spent inside the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self, extra: str = "") -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, extra, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, extra, inf)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key, extra)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key, extra)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, func: Callable[[], float | Dict],
+              labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, func, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def collect(self, labels: Dict[str, str] | None = None) -> Dict[str, List[str]]:
+        """Sample lines of every metric by name, with labels added to each; plain data, so it can cross processes"""
+        extra = ",".join(f'{name}="{_escape(value)}"' for name, value in (labels or {}).items())
+        return {name: metric.samples(extra) for name, metric in self._metrics.items()}
+
+    def render(self, *collected: Dict[str, List[str]]) -> str:
+        """Exposition text of this registry, or of samples collected from registries in several processes"""
+        if not collected:
+            collected = (self.collect(),)
+        lines: List[str] = []
+        for name, metric in self._metrics.items():
+            lines.extend(metric.header())
+            for samples in collected:
+                lines.extend(samples.get(name, ()))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Search ---
+SEARCH_QUERY_SECONDS = REGISTRY.histogram(
+    "automcp_search_query_seconds", "Latency of a single search backend query (including executor queueing) by query template", ["template"])
+SEARCH_QUERY_ERRORS = REGISTRY.counter(
+    "automcp_search_query_errors_total", "Search backend queries that raised an error by query template", ["template"])
+SEARCH_QUERY_SKIPPED = REGISTRY.counter(
+    "automcp_search_query_skipped_total",
+    "DDGS queries left out of a report by query template and reason (circuit_open, deadline, low_yield)",
+    ["template", "reason"])
+SEARCH_SECONDS = REGISTRY.histogram(
+    "automcp_search_seconds", "Latency of a full location search (all queries, filtering and ranking)")
+SEARCH_CACHE_LOOKUPS = REGISTRY.counter(
+    "automcp_search_cache_lookups_total", "Search cache lookups by result (hit, miss, coalesced)", ["result"])
+QUERY_CACHE_LOOKUPS = REGISTRY.counter(
+    "automcp_query_cache_lookups_total", "Persistent query result cache lookups by result (hit, miss)", ["result"])
+
+# --- Classification ---
+FILTER_RESULTS = REGISTRY.counter(
+    "automcp_filter_results_total",
+    "Search results handled by each filter stage (dedup, source, recency, location, severity) and outcome",
+    ["stage", "outcome"])
+
+# --- Scheduling ---
+SCHEDULER_LAG_SECONDS = REGISTRY.histogram(
+    "automcp_scheduler_lag_seconds", "Delay between a job's due time and its dispatch to a worker",
+    buckets=LAG_BUCKETS)
+AUTOMATION_RUN_SECONDS = REGISTRY.histogram(
+    "automcp_automation_run_seconds", "Duration of one automation execution (search and email)")
+
+# --- Delivery ---
+SMTP_CONNECT_SECONDS = REGISTRY.histogram(
+    "automcp_smtp_connect_seconds", "Time to open, secure and authenticate an SMTP connection")
+SMTP_SEND_SECONDS = REGISTRY.histogram(
+    "automcp_smtp_send_seconds", "Time to transmit one email on an open SMTP connection")
+EMAILS = REGISTRY.counter(
+    "automcp_emails_total", "Emails handled by the delivery pipeline by outcome (sent, failed, skipped)",
+    ["outcome"])
@@ -0,0 +1,137 @@
+from collections import OrderedDict, deque
+from typing import Deque, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+# One observed full cycle: template -> (results returned, URLs of its results that qualified as alerts)
+Observation = Dict[str, Tuple[int, FrozenSet[str]]]
+
+
+class _LocationState:
+    __slots__ = ("history", "cycles_since_explore", "explore_next")
+
+    def __init__(self, history_size: int):
+        self.history: Deque[Observation] = deque(maxlen=history_size)
+        self.cycles_since_explore = 0
+        self.explore_next = True
+
+
+class QueryPlanner:
+    """Chooses which query templates to run for a location, and how many results to ask for, from their past yield.
+
+    Every explore_every-th search of a location runs every template ("explore") and records which
+    qualified alerts each one found. In between, only the smallest set of templates that found all
+    of those alerts is run, plus the min_templates best ones so quiet locations keep some coverage.
+    A search that finds an alert the plan has not seen before makes the next search explore again.
+    explore_every <= 0 disables planning: every template runs with default_max_results.
+    """
+
+    def __init__(self, templates: Iterable[str], explore_every: int = 6, min_templates: int = 2,
+                 default_max_results: int = 8, min_max_results: int = 4, max_max_results: int = 16,
+                 history_size: int = 3, max_locations: int = 1024):
+        self.templates = list(templates)
+        self.explore_every = explore_every
+        self.min_templates = max(1, min_templates)
+        self.default_max_results = default_max_results
+        self.min_max_results = min_max_results
+        self.max_max_results = max_max_results
+        self.history_size = history_size
+        self.max_locations = max_locations
+        self._locations: "OrderedDict[str, _LocationState]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.explore_every > 0
+
+    def _state(self, location_key: str) -> _LocationState:
+        state = self._locations.get(location_key)
+        if state is None:
+            state = self._locations[location_key] = _LocationState(self.history_size)
+            if len(self._locations) > self.max_locations:
+                self._locations.popitem(last=False)
+        else:
+            self._locations.move_to_end(location_key)
+        return state
+
+    def _explore_plan(self) -> List[Tuple[str, int]]:
+        return [(template, self.default_max_results) for template in self.templates]
+
+    def plan(self, location_key: str) -> List[Tuple[str, int]]:
+        """(template name, max_results) pairs to run for this search, in template order"""
+        if not self.enabled:
+            return self._explore_plan()
+
+        state = self._state(location_key)
+        if state.explore_next or not state.history or state.cycles_since_explore >= self.explore_every - 1:
+            return self._explore_plan()
+
+        found: Dict[str, Set[str]] = {template: set() for template in self.templates}
+        returned: Dict[str, int] = dict.fromkeys(self.templates, 0)
+        peak_qualified: Dict[str, int] = dict.fromkeys(self.templates, 0)
+        for observation in state.history:
+            for template, (count, urls) in observation.items():
+                if template in found:
+                    found[template] |= urls
+                    returned[template] += count
+                    peak_qualified[template] = max(peak_qualified[template], len(urls))
+
+        # Greedy cover: keep adding the template that finds the most alerts not yet covered
+        chosen: List[str] = []
+        covered: Set[str] = set()
+        while True:
+            best = max(
+                (template for template in self.templates if template not in chosen),
+                key=lambda template: len(found[template] - covered), default=None,
+            )
+            if best is None or not found[best] - covered:
+                break
+            chosen.append(best)
+            covered |= found[best]
+
+        # Always keep some coverage, preferring templates that qualify more, then return more
+        for template in sorted(self.templates, key=lambda t: (len(found[t]), returned[t]), reverse=True):
+            if len(chosen) >= self.min_templates:
+                break
+            if template not in chosen:
+                chosen.append(template)
+
+        return [
+            (template, self._max_results(peak_qualified[template]))
+            for template in self.templates if template in chosen
+        ]
+
+    def _max_results(self, peak_qualified: int) -> int:
+        # Ask for headroom above the most alerts this template ever produced in one search
+        return max(self.min_max_results, min(self.max_max_results, 2 * peak_qualified + 2))
+
+    def record(self, location_key: str, planned: List[Tuple[str, int]], results: Dict[str, list],
+               qualified_urls: Set[str]) -> None:
+        """Record what a search planned and what each answered template returned; qualified_urls are its alerts"""
+        if not self.enabled:
+            return
+
+        state = self._state(location_key)
+        explored = len(planned) == len(self.templates)
+        if explored and len(results) == len(self.templates):
+            state.history.append({
+                template: (len(template_results), frozenset(
+                    result.get("href", "") for result in template_results
+                    if result.get("href", "") in qualified_urls
+                ))
+                for template, template_results in results.items()
+            })
+            state.cycles_since_explore = 0
+            state.explore_next = False
+            return
+
+        state.cycles_since_explore += 1
+        if explored:
+            # Some template failed during exploration: try again next time
+            state.explore_next = True
+            return
+
+        known: Set[str] = set()
+        for observation in state.history:
+            for _, urls in observation.values():
+                known |= urls
+        if qualified_urls - known:
+            # Something new is happening here: look with every template next time
+            state.explore_next = True
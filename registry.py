@@ -0,0 +1,79 @@
+from typing import Any, Dict, Iterable, List
+
+
+def normalize_email(email: str) -> str:
+    return email.lower().strip()
+
+
+class AutomationRegistry(dict):
+    """automation_key -> automation info, with an email index kept in step with every change"""
+
+    def __init__(self):
+        super().__init__()
+        # Index values are dicts used as insertion-ordered sets of automation keys
+        self._by_email: Dict[str, Dict[str, None]] = {}
+
+    @staticmethod
+    def _index_add(index: Dict[str, Dict[str, None]], value: str, automation_key: str) -> None:
+        index.setdefault(value, {})[automation_key] = None
+
+    @staticmethod
+    def _index_remove(index: Dict[str, Dict[str, None]], value: str, automation_key: str) -> None:
+        keys = index.get(value)
+        if keys is not None:
+            keys.pop(automation_key, None)
+            if not keys:
+                del index[value]
+
+    def _unindex(self, automation_key: str, info: Dict[str, Any]) -> None:
+        self._index_remove(self._by_email, normalize_email(info['user_email']), automation_key)
+
+    def __setitem__(self, automation_key: str, info: Dict[str, Any]) -> None:
+        previous = super().get(automation_key)
+        if previous is not None:
+            self._unindex(automation_key, previous)
+        super().__setitem__(automation_key, info)
+        self._index_add(self._by_email, normalize_email(info['user_email']), automation_key)
+
+    def __delitem__(self, automation_key: str) -> None:
+        info = super().__getitem__(automation_key)
+        super().__delitem__(automation_key)
+        self._unindex(automation_key, info)
+
+    _MISSING = object()
+
+    def pop(self, automation_key: str, default: Any = _MISSING) -> Any:
+        if automation_key not in self:
+            if default is self._MISSING:
+                raise KeyError(automation_key)
+            return default
+        info = super().__getitem__(automation_key)
+        del self[automation_key]
+        return info
+
+    def popitem(self):
+        raise TypeError("AutomationRegistry does not support popitem")
+
+    def setdefault(self, automation_key: str, default: Any = None) -> Any:
+        if automation_key not in self:
+            self[automation_key] = default
+        return self[automation_key]
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for automation_key, info in dict(*args, **kwargs).items():
+            self[automation_key] = info
+
+    def clear(self) -> None:
+        super().clear()
+        self._by_email.clear()
+
+    def keys_for_email(self, email: str) -> List[str]:
+        return list(self._by_email.get(normalize_email(email), ()))
+
+    def for_emails(self, emails: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Automations of any of the given emails, in O(results)"""
+        return {
+            automation_key: self[automation_key]
+            for email in emails
+            for automation_key in self.keys_for_email(email)
+        }
@@ -0,0 +1,270 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    title: str
+    snippet: str
+    url: str
+    severity: int
+    emoji: str
+    fingerprint: str        # content hash, recognises the same story under another URL
+
+
+@dataclass(frozen=True, slots=True)
+class DisasterReport:
+    """Result of one location search: qualified alerts (highest severity first) plus summary fields"""
+    location: str
+    searched_at: str
+    alerts: Tuple[Alert, ...]
+    max_severity: int
+    level: str              # 'critical', 'high', 'significant' or 'clear'
+    severity_emoji: str
+    fingerprint: str        # identifies identical rendered output (location, search time, alerts)
+
+    @classmethod
+    def build(cls, location: str, searched_at: str, alerts) -> "DisasterReport":
+        """Create a report, deriving the summary fields from the alerts once"""
+        alerts = tuple(alerts)
+        max_severity = max((alert.severity for alert in alerts), default=0)
+        if not alerts:
+            level, severity_emoji = 'clear', "✅"
+        elif max_severity >= 9:
+            level, severity_emoji = 'critical', "🚨"
+        elif max_severity >= 8:
+            level, severity_emoji = 'high', "🔴"
+        else:
+            level, severity_emoji = 'significant', "🟠"
+
+        digest = hashlib.sha1(f"{location}\n{searched_at}".encode("utf-8"))
+        for alert in alerts:
+            digest.update(f"\n{alert.url}\n{alert.fingerprint}\n{alert.severity}".encode("utf-8"))
+
+        return cls(location, searched_at, alerts, max_severity, level, severity_emoji, digest.hexdigest()[:20])
+
+    def with_alerts(self, alerts) -> "DisasterReport":
+        """Same search, restricted to a subset of its alerts (e.g. only new ones)"""
+        return DisasterReport.build(self.location, self.searched_at, alerts)
+
+    def for_location(self, location: str) -> "DisasterReport":
+        """Same results labelled with another spelling of the location"""
+        if location == self.location:
+            return self
+        return DisasterReport.build(location, self.searched_at, self.alerts)
+
+    @property
+    def incident_count(self) -> int:
+        return len(self.alerts)
+
+
+def format_disaster_report(report: DisasterReport) -> str:
+    """Format a report (alerts highest severity first) as the markdown text"""
+    location = report.location
+    current_time = report.searched_at
+    qualified_news = report.alerts
+    if qualified_news:
+        header_emoji = report.severity_emoji
+        
+        response_parts = [
+            f"**{header_emoji} EMERGENCY ALERTS for {location}**",
+            f"**Search Time:** {current_time}",
+            f"**Time Frame:** Last 3 days only",
+            f"**Found {len(qualified_news)} critical emergency alerts (severity ≥7/10)**\n"
+        ]
+        
+        # Group by severity
+        critical = [item for item in qualified_news if item.severity >= 9]
+        high = [item for item in qualified_news if 8 <= item.severity < 9]
+        significant = [item for item in qualified_news if 7 <= item.severity < 8]
+        
+        if critical:
+            response_parts.append("**🚨 CRITICAL EMERGENCIES (Severity 9-10):**")
+            for i, item in enumerate(critical, 1):
+                response_parts.extend([
+                    f"**{i}. {item.emoji} [{item.severity}/10] {item.title}**",
+                    f"📰 {item.snippet}" if item.snippet else "📝 No preview available",
+                    f"🔗 {item.url}\n"
+                ])
+        
+        if high:
+            response_parts.append("**🔴 HIGH SEVERITY (Severity 8):**")
+            for i, item in enumerate(high, 1):
+                response_parts.extend([
+                    f"**{i}. {item.emoji} [{item.severity}/10] {item.title}**",
+                    f"📰 {item.snippet}" if item.snippet else "📝 No preview available",
+                    f"🔗 {item.url}\n"
+                ])
+        
+        if significant:
+            response_parts.append("**🟠 SIGNIFICANT ALERTS (Severity 7):**")
+            for i, item in enumerate(significant, 1):
+                response_parts.extend([
+                    f"**{i}. {item.emoji} [{item.severity}/10] {item.title}**",
+                    f"📰 {item.snippet}" if item.snippet else "📝 No preview available",
+                    f"🔗 {item.url}\n"
+                ])
+        
+        response_parts.extend([
+            "**Sources:** Major news outlets and verified channels",
+            "**Note:** Only emergency-level incidents from last 3 days. Verify with official sources."
+        ])
+        
+        response_text = "\n".join(response_parts)
+    else:
+        response_text = (
+            f"**NO CRITICAL EMERGENCY ALERTS for {location}**\n\n"
+            f"**Search Time:** {current_time}\n"
+            f"**Time Frame:** Last 3 days\n"
+            f"**Location:** {location}\n\n"
+            f"**Searched:** Major news outlets for emergency-level incidents\n"
+            f"**Emergency Threshold:** Severity ≥7/10\n"
+            f"**Status:** No critical emergency or disaster alerts detected\n\n"
+            f"**🎉 Good News!** No critical emergency alerts found from verified news sources for your location in the last 3 days."
+        )
+    
+    return response_text
+
+
+def render_email_subject(report: DisasterReport) -> str:
+    """Email subject line derived from the report's severity level"""
+    location = report.location
+    severity_emoji = report.severity_emoji
+    alert_count = report.incident_count
+
+    if report.level == 'clear':
+        return f"{severity_emoji} All Clear - {location} Monitoring Report"
+    if report.level == 'critical':
+        return f"{severity_emoji} CRITICAL ALERT - {location} ({alert_count} incidents)"
+    if report.level == 'high':
+        return f"{severity_emoji} High Alert - {location} ({alert_count} incidents)"
+    return f"{severity_emoji} Significant Alert - {location} ({alert_count} incidents)"
+
+
+def render_email_bodies(report: DisasterReport, report_text: str | None = None) -> Tuple[str, str]:
+    """Render the (plain text, HTML) email bodies for a report"""
+    if report_text is None:
+        report_text = format_disaster_report(report)
+    generated_at = datetime.now().strftime("%B %d, %Y at %I:%M %p UTC")
+
+    # Create clean professional HTML email body
+    html_body = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+    body {{ 
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
+        line-height: 1.6; 
+        color: #2c3e50; 
+        max-width: 700px; 
+        margin: 0 auto; 
+        padding: 20px; 
+        background-color: #ffffff;
+    }}
+    .header {{ 
+        background-color: #f8f9fa; 
+        border: 1px solid #e9ecef; 
+        padding: 25px; 
+        border-radius: 6px; 
+        text-align: center; 
+        margin-bottom: 25px; 
+    }}
+    .content {{ 
+        background-color: #ffffff; 
+        padding: 25px; 
+        border: 1px solid #dee2e6; 
+        border-radius: 6px; 
+        margin-bottom: 20px;
+    }}
+    .footer {{ 
+        text-align: center; 
+        margin-top: 25px; 
+        padding: 20px; 
+        background-color: #f8f9fa; 
+        border: 1px solid #e9ecef; 
+        border-radius: 6px; 
+        font-size: 13px; 
+        color: #6c757d; 
+    }}
+    .timestamp {{ 
+        color: #6c757d; 
+        font-size: 14px; 
+        margin-top: 8px;
+    }}
+    .location {{ 
+        font-size: 22px; 
+        font-weight: 600; 
+        margin: 8px 0; 
+        color: #495057;
+    }}
+    .report-content {{
+        font-family: 'Courier New', monospace;
+        font-size: 14px;
+        line-height: 1.5;
+        white-space: pre-wrap;
+        word-wrap: break-word;
+        color: #212529;
+    }}
+    .divider {{ 
+        height: 1px; 
+        background-color: #dee2e6; 
+        margin: 20px 0; 
+        border: none;
+    }}
+    .emergency-note {{
+        background-color: #fff3cd;
+        border: 1px solid #ffeaa7;
+        padding: 15px;
+        border-radius: 4px;
+        margin: 15px 0;
+        font-weight: 500;
+    }}
+    </style>
+</head>
+<body>
+    <div class="header">
+    <div class="location">{report.severity_emoji} Emergency Monitoring Report</div>
+    <div style="font-size: 16px; color: #495057;">Location: {report.location}</div>
+    <div class="timestamp">Generated: {generated_at}</div>
+    </div>
+    
+    <div class="content">
+    <div class="report-content">{report_text}</div>
+    </div>
+    
+    <hr class="divider">
+    
+    <div class="emergency-note">
+    <strong>⚠️ Important:</strong> Always verify emergency information from official sources before taking action.
+    For immediate emergencies, contact your local emergency services.
+    </div>
+    
+    <div class="footer">
+    <strong>Emergency Monitoring System</strong><br>
+    This is an automated report from your Location Monitoring System.<br>
+    Stay safe and stay informed.
+    </div>
+</body>
+</html>
+    """
+    
+    # Plain text version
+    plain_text = f"""
+EMERGENCY MONITORING REPORT
+Location: {report.location}
+Generated: {generated_at}
+
+{report_text}
+
+---
+IMPORTANT: Always verify emergency information from official sources before taking action.
+For immediate emergencies, contact your local emergency services.
+
+This is an automated report from your Location Monitoring System.
+Stay safe and stay informed.
+    """
+
+    return plain_text, html_body
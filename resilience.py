@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while after repeated failures.
+
+    closed: calls go through. open: calls are refused until reset_seconds have passed.
+    half-open: one trial call is let through; success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_running = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may be made now"""
+        if not self.enabled:
+            return True
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_running = False
+        if self.enabled and (self.opened_at is not None or self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+
+
+async def hedged(call: Callable[[], Awaitable[Any]], hedge_after: float) -> Any:
+    """Await call(); if it has not finished after hedge_after seconds, race it against a second call.
+
+    The first call to succeed wins and the other is cancelled. hedge_after <= 0 disables hedging.
+    """
+    tasks = [asyncio.ensure_future(call())]
+    if hedge_after <= 0:
+        return await tasks[0]
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if done:
+            return tasks[0].result()
+
+        tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,244 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Tuple
+
+from metrics import SCHEDULER_LAG_SECONDS
+
+# A job runs one execution and returns the delay in seconds until its next run,
+# or None when it is finished and should not be rescheduled.
+JobFunc = Callable[[], Awaitable[float | None]]
+
+
+class AutomationScheduler:
+    """Single min-heap timer that dispatches due jobs to a bounded pool of worker tasks"""
+
+    def __init__(self, worker_count: int = 16, lag_warning_seconds: float = 1.0,
+                 start_jitter_seconds: float = 0.0, load_window_seconds: int = 3600):
+        self.worker_count = max(1, worker_count)
+        self.lag_warning_seconds = lag_warning_seconds
+        self.start_jitter_seconds = max(0.0, start_jitter_seconds)
+        self.load_window_seconds = max(1, load_window_seconds)
+
+        # Heap entries are (due_at, sequence, key); stale entries are skipped lazily
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._jobs: Dict[str, JobFunc] = {}
+        self._due: Dict[str, Tuple[float, int]] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+
+        self._ready: asyncio.Queue | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._workers: List[asyncio.Task] = []
+
+        # Lag = how late a job was handed to a worker compared to its due time
+        self.dispatched = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+        # Pending due times per whole second (for phase spreading) and recent dispatches per second
+        self._due_per_second: Counter = Counter()
+        self._dispatch_seconds: Deque[List[int]] = deque()
+
+    # --- Lifecycle ---
+    def ensure_started(self) -> None:
+        """Start the dispatcher and worker pool on the running event loop if needed"""
+        if self._dispatcher is not None and not self._dispatcher.done():
+            return
+
+        self._ready = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        self._workers = [asyncio.create_task(self._worker_loop(i)) for i in range(self.worker_count)]
+        print(f"Scheduler started with {self.worker_count} workers")
+
+    async def stop(self) -> None:
+        """Cancel the dispatcher, workers and any job that is currently executing"""
+        tasks = [t for t in [self._dispatcher, *self._workers, *self._running.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._workers = []
+        self._running.clear()
+
+    # --- Job management ---
+    def schedule(self, key: str, func: JobFunc, delay: float = 0.0, spread_seconds: float = 0.0) -> float:
+        """Register (or replace) the job for key and run it after delay seconds.
+
+        With spread_seconds the first run is moved to the least loaded second in
+        [delay, delay + spread_seconds], and start jitter is added on top, so bulk
+        creations or restarts do not all fire (and then repeat) in the same second.
+        Returns the delay actually used.
+        """
+        self.ensure_started()
+        self._jobs[key] = func
+        self._forget_due(key)
+
+        if spread_seconds > 0:
+            delay = self._least_loaded_delay(delay, spread_seconds)
+        if self.start_jitter_seconds > 0:
+            delay += random.uniform(0, self.start_jitter_seconds)
+
+        self._push(key, delay)
+        return delay
+
+    def cancel(self, key: str) -> bool:
+        """Remove the job for key, interrupting it if it is executing. Returns True if it existed"""
+        existed = self._jobs.pop(key, None) is not None
+        self._forget_due(key)
+
+        task = self._running.pop(key, None)
+        if task is not None and not task.done():
+            task.cancel()
+            existed = True
+
+        return existed
+
+    def next_due_in(self, key: str) -> float | None:
+        """Seconds until the next run of key, or None if it is running or not scheduled"""
+        due = self._due.get(key)
+        if due is None:
+            return None
+        return max(0.0, due[0] - time.monotonic())
+
+    def load_histogram(self) -> Dict[int, int]:
+        """Histogram of dispatches per second over the load window: {runs in a second: number of seconds}"""
+        self._trim_dispatch_seconds(int(time.time()))
+        histogram = Counter(count for _, count in self._dispatch_seconds)
+        return dict(sorted(histogram.items()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of scheduler load and lag for reporting"""
+        histogram = self.load_histogram()
+        return {
+            'scheduled_jobs': len(self._jobs),
+            'pending_timers': len(self._due),
+            'queue_depth': self._ready.qsize() if self._ready is not None else 0,
+            'running_jobs': len(self._running),
+            'workers': self.worker_count,
+            'dispatched': self.dispatched,
+            'last_lag_seconds': round(self.last_lag, 4),
+            'max_lag_seconds': round(self.max_lag, 4),
+            'avg_lag_seconds': round(self.total_lag / self.dispatched, 4) if self.dispatched else 0.0,
+            'peak_dispatches_per_second': max(histogram, default=0),
+            'dispatches_per_second_histogram': histogram,
+        }
+
+    # --- Internals ---
+    def _least_loaded_delay(self, delay: float, spread_seconds: float) -> float:
+        """Pick the second in [delay, delay + spread_seconds] with the fewest pending runs (earliest on ties)"""
+        now = time.monotonic()
+        first = int(now + max(0.0, delay))
+        best_second = min(range(first, first + int(spread_seconds) + 1),
+                          key=lambda second: self._due_per_second[second])
+        return max(delay, best_second - now)
+
+    def _forget_due(self, key: str) -> None:
+        due = self._due.pop(key, None)
+        if due is not None:
+            second = int(due[0])
+            self._due_per_second[second] -= 1
+            if self._due_per_second[second] <= 0:
+                del self._due_per_second[second]
+
+    def _record_dispatch(self) -> None:
+        second = int(time.time())
+        if self._dispatch_seconds and self._dispatch_seconds[-1][0] == second:
+            self._dispatch_seconds[-1][1] += 1
+        else:
+            self._dispatch_seconds.append([second, 1])
+        self._trim_dispatch_seconds(second)
+
+    def _trim_dispatch_seconds(self, now_second: int) -> None:
+        while self._dispatch_seconds and self._dispatch_seconds[0][0] <= now_second - self.load_window_seconds:
+            self._dispatch_seconds.popleft()
+
+    def _push(self, key: str, delay: float) -> None:
+        due_at = time.monotonic() + max(0.0, delay)
+        sequence = next(self._sequence)
+        self._due[key] = (due_at, sequence)
+        self._due_per_second[int(due_at)] += 1
+        heapq.heappush(self._heap, (due_at, sequence, key))
+
+        # Wake the dispatcher if this job is now the earliest one
+        if self._wakeup is not None and self._heap[0][1] == sequence:
+            self._wakeup.set()
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                # A timer instead of wait_for: on Python 3.11 wait_for can swallow a cancel that
+                # races with the event being set, which left stop() waiting forever
+                timer = asyncio.get_running_loop().call_later(delay, self._wakeup.set)
+                try:
+                    await self._wakeup.wait()
+                finally:
+                    timer.cancel()
+                continue
+
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due_at, sequence, key = heapq.heappop(self._heap)
+
+                # Skip entries superseded by a reschedule or a cancellation
+                if self._due.get(key) != (due_at, sequence):
+                    continue
+                self._forget_due(key)
+                self._record_dispatch()
+
+                lag = now - due_at
+                self.dispatched += 1
+                self.last_lag = lag
+                self.total_lag += lag
+                self.max_lag = max(self.max_lag, lag)
+                SCHEDULER_LAG_SECONDS.observe(lag)
+                if lag > self.lag_warning_seconds:
+                    print(f"⚠️ Scheduler lag {lag:.2f}s dispatching {key}")
+
+                self._ready.put_nowait((key, self._jobs.get(key)))
+
+    async def _worker_loop(self, worker_id: int) -> None:
+        while True:
+            key, func = await self._ready.get()
+            try:
+                # Skip jobs cancelled or replaced after they were queued
+                if func is None or self._jobs.get(key) is not func:
+                    continue
+
+                task = asyncio.create_task(func())
+                self._running[key] = task
+                try:
+                    next_delay = await task
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise
+                    # Only this job was cancelled; keep the worker alive
+                    continue
+                except Exception as e:
+                    print(f"Scheduler job {key} failed on worker {worker_id}: {str(e)}")
+                    next_delay = None
+                finally:
+                    if self._running.get(key) is task:
+                        del self._running[key]
+
+                # Reschedule unless the job finished or was cancelled/replaced meanwhile
+                if next_delay is None:
+                    if self._jobs.get(key) is func:
+                        del self._jobs[key]
+                elif self._jobs.get(key) is func and key not in self._due:
+                    self._push(key, next_delay)
+            finally:
+                self._ready.task_done()
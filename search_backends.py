@@ -0,0 +1,281 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, List, Tuple
+from urllib.parse import urlparse
+
+from ddgs import DDGS
+from metrics import QUERY_CACHE_LOOKUPS
+
+# A search result, as returned by DDGS: {'title': ..., 'body': ..., 'href': ...}
+Result = Dict[str, str]
+
+
+class SearchBackend:
+    """Source of search results; every backend answers search(query, max_results) asynchronously"""
+    name = "backend"
+
+    async def search(self, query: str, max_results: int, owner: str = "") -> List[Result]:
+        """Up to max_results results for query; owner identifies the caller for fair scheduling"""
+        raise NotImplementedError
+
+
+class DDGSBackend(SearchBackend):
+    """Live web search through DDGS, run on the shared rate limited search executor"""
+    name = "ddgs"
+
+    def __init__(self, executor, timeout: int = 5, client_factory: Callable[..., DDGS] = DDGS):
+        self.executor = executor
+        self.timeout = timeout
+        self.client_factory = client_factory
+
+    async def search(self, query: str, max_results: int, owner: str = "") -> List[Result]:
+        return await self.executor.submit(
+            owner, lambda: list(self.client_factory(timeout=self.timeout).text(query, max_results=max_results))
+        )
+
+
+# --- Offline feed backend ---
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, *names: str) -> str:
+    for child in element:
+        if _local_name(child.tag) in names and child.text and child.text.strip():
+            return child.text.strip()
+    return ""
+
+
+def _parse_published(value: str) -> datetime | None:
+    if not value:
+        return None
+    try:
+        published = parsedate_to_datetime(value)  # RSS: RFC 822
+    except (TypeError, ValueError):
+        try:
+            published = datetime.fromisoformat(value.replace("Z", "+00:00"))  # Atom / JSON: ISO 8601
+        except ValueError:
+            return None
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+def _age_phrase(published: datetime | None) -> str:
+    """How old an item is, in the words the alert classifier looks for.
+
+    Recent items avoid "days ago", which the classifier reads as old news.
+    """
+    if published is None:
+        return ""
+    days = (datetime.now(timezone.utc) - published).total_seconds() / 86400
+    if days < 1:
+        return "published today"
+    if days < 2:
+        return "published yesterday"
+    if days < 3:
+        return "published 48 hours ago"
+    if days < 4:
+        return "published 72 hours ago"
+    return "published last week or earlier"
+
+
+def _feed_item(title: str, body: str, href: str, published: str) -> Dict:
+    return {'title': title, 'body': body, 'href': href, 'published': _parse_published(published)}
+
+
+def _as_result(item: Dict) -> Result:
+    """Search result for a feed item, its age spelled out when the search runs"""
+    age = _age_phrase(item['published'])
+    return {'title': item['title'], 'body': f"{item['body']} ({age})" if age else item['body'], 'href': item['href']}
+
+
+def _read_feed_file(path: str) -> List[Dict]:
+    """Items of an RSS 2.0 / Atom file, a JSON list or a JSON lines file"""
+    if path.endswith((".json", ".jsonl")):
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f) if path.endswith(".json") else [json.loads(line) for line in f if line.strip()]
+        return [
+            _feed_item(
+                record.get('title', ""),
+                record.get('body') or record.get('description') or record.get('snippet', ""),
+                record.get('href') or record.get('url') or record.get('link', ""),
+                record.get('published', ""),
+            )
+            for record in records
+        ]
+
+    items = []
+    for element in ET.parse(path).getroot().iter():
+        kind = _local_name(element.tag)
+        if kind not in ("item", "entry"):
+            continue
+        href = _child_text(element, "link")
+        if not href:
+            # Atom: <link href="..."/>
+            href = next((child.get("href", "") for child in element if _local_name(child.tag) == "link"), "")
+        items.append(_feed_item(
+            _child_text(element, "title"),
+            _child_text(element, "description", "summary", "content"),
+            href,
+            _child_text(element, "pubDate", "published", "updated"),
+        ))
+    return items
+
+
+_QUERY_TOKEN = re.compile(r'site:(\S+)|"([^"]+)"|(\S+)')
+_QUERY_STOPWORDS = frozenset({"or", "and", "not", "the", "today", "news"})
+
+
+def _parse_query(query: str) -> Tuple[List[str], List[str]]:
+    """site: domains and lowercase terms (quoted phrases kept whole) of a search query"""
+    sites, terms = [], []
+    for site, phrase, word in _QUERY_TOKEN.findall(query.lower()):
+        if site:
+            sites.append(site)
+        elif phrase:
+            terms.append(phrase)
+        elif len(word) >= 3 and word not in _QUERY_STOPWORDS:
+            terms.append(word)
+    return sites, terms
+
+
+class FeedBackend(SearchBackend):
+    """Offline search over local RSS/Atom/JSON feed files, for air-gapped runs, tests and benchmarks.
+
+    Files (or every file of a directory) are re-read when they change. An item matches a query
+    when it contains any query term; items with more matching terms rank first.
+    """
+    name = "feed"
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = [path for path in paths if path]
+        self._lock = threading.Lock()
+        self._signature: Tuple = ()
+        self._items: List[Dict] = []
+
+    def _files(self) -> List[str]:
+        files = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)))
+            else:
+                files.append(path)
+        return [path for path in files if os.path.isfile(path)]
+
+    def items(self) -> List[Dict]:
+        """Every feed item, reloaded if any file was added, removed or modified"""
+        with self._lock:
+            files = self._files()
+            signature = tuple((path, os.path.getmtime(path)) for path in files)
+            if signature != self._signature:
+                items = []
+                for path in files:
+                    try:
+                        items.extend(_read_feed_file(path))
+                    except (OSError, ValueError, ET.ParseError) as e:
+                        print(f"Skipping feed file {path}: {str(e)}")
+                self._items, self._signature = items, signature
+            return self._items
+
+    async def search(self, query: str, max_results: int, owner: str = "") -> List[Result]:
+        items = await asyncio.to_thread(self.items)
+        sites, terms = _parse_query(query)
+
+        scored = []
+        for position, item in enumerate(items):
+            if sites and not any(urlparse(item['href']).netloc.endswith(site) for site in sites):
+                continue
+            text = (item['title'] + " " + item['body']).lower()
+            score = sum(1 for term in terms if term in text)
+            if score:
+                scored.append((-score, position, item))
+        scored.sort(key=lambda entry: entry[:2])
+        return [_as_result(item) for _, _, item in scored[:max_results]]
+
+
+class MergingBackend(SearchBackend):
+    """Queries several backends in parallel under one deadline and interleaves their results.
+
+    Backends that have not answered by the deadline, or fail, are left out; the search only fails
+    if none of them answered. Results are deduplicated by URL, taking each backend's best in turn.
+    """
+    name = "merge"
+
+    def __init__(self, backends: List[SearchBackend], deadline_seconds: float = 10.0):
+        self.backends = backends
+        self.deadline_seconds = deadline_seconds
+
+    async def search(self, query: str, max_results: int, owner: str = "") -> List[Result]:
+        tasks = [asyncio.ensure_future(backend.search(query, max_results, owner)) for backend in self.backends]
+        try:
+            _, late = await asyncio.wait(tasks, timeout=self.deadline_seconds or None)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        answers, error = [], None
+        for backend, task in zip(self.backends, tasks):
+            if task in late or task.cancelled():
+                print(f"Search backend {backend.name} missed the {self.deadline_seconds}s deadline")
+            elif task.exception() is not None:
+                error = error or task.exception()
+                print(f"Search backend {backend.name} failed: {type(task.exception()).__name__} {str(task.exception())}")
+            else:
+                answers.append(task.result())
+        if not answers:
+            raise error or RuntimeError(f"No search backend answered within {self.deadline_seconds}s")
+
+        merged, seen_urls = [], set()
+        for rank in range(max(len(answer) for answer in answers)):
+            for answer in answers:
+                if rank < len(answer) and answer[rank].get("href") not in seen_urls:
+                    seen_urls.add(answer[rank].get("href"))
+                    merged.append(answer[rank])
+        return merged[:max_results]
+
+
+class CachingBackend(SearchBackend):
+    """Answers repeated queries from a QueryResultStore of raw responses (which survives restarts).
+
+    Store reads and writes (SQLite, JSON, pruning) run in a worker thread, off the event loop.
+    """
+
+    def __init__(self, backend: SearchBackend, store):
+        self.backend = backend
+        self.store = store
+        self.name = backend.name
+
+    async def search(self, query: str, max_results: int, owner: str = "") -> List[Result]:
+        results = await asyncio.to_thread(self.store.get, self.name, query, max_results)
+        if results is not None:
+            QUERY_CACHE_LOOKUPS.inc(result="hit")
+            return results
+        QUERY_CACHE_LOOKUPS.inc(result="miss")
+        results = await self.backend.search(query, max_results, owner)
+        await asyncio.to_thread(self.store.set, self.name, query, max_results, results)
+        return results
+
+
+def build_search_backend(names: str, executor, ddgs_timeout: int, feed_paths: str,
+                         merge_deadline_seconds: float) -> SearchBackend:
+    """Backend for a comma separated list of backend names; several are merged"""
+    backends = []
+    for name in (name.strip().lower() for name in names.split(",")):
+        if name == "ddgs":
+            backends.append(DDGSBackend(executor, ddgs_timeout))
+        elif name == "feed":
+            backends.append(FeedBackend(path.strip() for path in feed_paths.split(",")))
+        elif name:
+            raise ValueError(f"Unknown search backend '{name}' (expected ddgs or feed)")
+    if not backends:
+        raise ValueError("No search backend configured")
+    if len(backends) == 1:
+        return backends[0]
+    return MergingBackend(backends, merge_deadline_seconds)
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+
+class TokenBucket:
+    """Async token bucket limiting how many outbound queries start per second"""
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate_per_second = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock: asyncio.Lock | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        if not self.enabled:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # The lock keeps waiters in FIFO order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+                self._refill()
+            self._tokens -= 1
+
+
+class SearchExecutor:
+    """Bounded thread pool for blocking search calls, rate limited and shared fairly between owners"""
+
+    def __init__(self, max_workers: int = 4, rate_per_second: float = 0.0, burst: int = 6):
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="search")
+        # One FIFO per owner, served round-robin so a busy owner cannot starve the rest
+        self._queues: "OrderedDict[str, Deque[Tuple[Callable[[], Any], asyncio.Future, float]]]" = OrderedDict()
+        self._available: asyncio.Semaphore | None = None
+        self._workers: List[asyncio.Task] = []
+
+        self.completed = 0
+        self.failed = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self.total_wait = 0.0
+
+    def ensure_started(self) -> None:
+        """Start the dispatch workers on the running event loop if needed"""
+        if self._workers and not all(task.done() for task in self._workers):
+            return
+
+        self._available = asyncio.Semaphore(sum(len(q) for q in self._queues.values()))
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self.max_workers)]
+
+    async def submit(self, owner: str, func: Callable[[], Any]) -> Any:
+        """Queue a blocking call on behalf of owner and return its result"""
+        self.ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(owner, deque()).append((func, future, time.monotonic()))
+        self._available.release()
+        return await future
+
+    def queue_depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.completed + self.failed
+        return {
+            'queue_depth': self.queue_depth(),
+            'waiting_owners': len(self._queues),
+            'workers': self.max_workers,
+            'completed': self.completed,
+            'failed': self.failed,
+            'last_wait_seconds': round(self.last_wait, 4),
+            'max_wait_seconds': round(self.max_wait, 4),
+            'avg_wait_seconds': round(self.total_wait / started, 4) if started else 0.0,
+        }
+
+    def _next_item(self) -> Tuple[Callable[[], Any], asyncio.Future, float]:
+        owner, queue = self._queues.popitem(last=False)
+        item = queue.popleft()
+        if queue:
+            # Owner goes to the back of the rotation
+            self._queues[owner] = queue
+        return item
+
+    async def _worker_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._available.acquire()
+            func, future, enqueued_at = self._next_item()
+            if future.cancelled():
+                continue
+
+            await self.rate_limiter.acquire()
+
+            wait = time.monotonic() - enqueued_at
+            self.last_wait = wait
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+            try:
+                result = await loop.run_in_executor(self._pool, func)
+            except Exception as e:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.completed += 1
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pool.shutdown(wait=False, cancel_futures=True)
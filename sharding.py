@@ -0,0 +1,192 @@
+import asyncio
+import bisect
+import hashlib
+import itertools
+import multiprocessing
+import threading
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# Shard side request handlers: name -> async function(*args)
+Handlers = Dict[str, Callable[..., Awaitable[Any]]]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.sha1(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to shard indexes, with virtual nodes for balance"""
+
+    def __init__(self, shard_count: int, replicas: int = 64):
+        self.shard_count = max(1, shard_count)
+        points = sorted(
+            (_hash(f"shard-{shard}-{replica}"), shard)
+            for shard in range(self.shard_count)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def owner(self, key: str) -> int:
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._shards[index]
+
+
+class _ShardConnection:
+    """Front end side of one shard process: request/reply over a pipe, matched by request id"""
+
+    def __init__(self, index: int, process, conn, loop: asyncio.AbstractEventLoop):
+        self.index = index
+        self.process = process
+        self._conn = conn
+        self._loop = loop
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._reader = threading.Thread(target=self._read_replies, name=f"shard-{index}-reader", daemon=True)
+        self._reader.start()
+
+    def _read_replies(self) -> None:
+        while True:
+            try:
+                request_id, ok, payload = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            self._loop.call_soon_threadsafe(self._resolve, request_id, ok, payload)
+        self._loop.call_soon_threadsafe(self._fail_all)
+
+    def _resolve(self, request_id: int, ok: bool, payload: Any) -> None:
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(f"Shard {self.index} failed: {payload}"))
+
+    def _fail_all(self) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(f"Shard {self.index} is not running"))
+
+    async def call(self, method: str, *args: Any) -> Any:
+        if not self.process.is_alive():
+            raise RuntimeError(f"Shard {self.index} is not running")
+
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        with self._send_lock:
+            self._conn.send((request_id, method, args))
+        return await future
+
+    def close(self, timeout: float) -> None:
+        with self._send_lock:
+            try:
+                self._conn.send((None, "stop", ()))
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self._conn.close()
+
+
+class ShardRouter:
+    """Runs automations in worker processes and routes each automation_key to its owning shard"""
+
+    def __init__(self, shard_count: int, target: Callable[[int, int, Any], None]):
+        self.shard_count = max(1, shard_count)
+        self.ring = HashRing(self.shard_count)
+        self._target = target
+        self._shards: List[_ShardConnection] = []
+
+    def start(self) -> None:
+        """Spawn one process per shard; target(index, shard_count, conn) runs the shard"""
+        loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context("spawn")
+        for index in range(self.shard_count):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=self._target, args=(index, self.shard_count, child_conn),
+                name=f"automcp-shard-{index}", daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._shards.append(_ShardConnection(index, process, parent_conn, loop))
+        print(f"Started {self.shard_count} automation shard processes")
+
+    def owner(self, automation_key: str) -> int:
+        return self.ring.owner(automation_key)
+
+    async def call(self, automation_key: str, method: str, *args: Any) -> Any:
+        """Run method on the shard that owns automation_key"""
+        return await self._shards[self.owner(automation_key)].call(method, *args)
+
+    async def call_shard(self, index: int, method: str, *args: Any) -> Any:
+        """Run method on one shard by index"""
+        return await self._shards[index].call(method, *args)
+
+    async def broadcast(self, method: str, *args: Any) -> List[Any]:
+        """Run method on every shard and return their results in shard order"""
+        return list(await asyncio.gather(*(shard.call(method, *args) for shard in self._shards)))
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, shard.close, timeout) for shard in self._shards))
+        self._shards = []
+
+
+async def serve_shard(conn, handlers: Handlers) -> None:
+    """Shard side loop: run each request from the front end as a task and send back its result"""
+    loop = asyncio.get_running_loop()
+    send_lock = threading.Lock()
+    stopped = asyncio.Event()
+    tasks = set()
+
+    def reply(request_id: int, ok: bool, payload: Any) -> None:
+        with send_lock:
+            try:
+                conn.send((request_id, ok, payload))
+            except (OSError, ValueError):
+                pass
+
+    async def handle(request_id: int, method: str, args: Tuple) -> None:
+        handler = handlers.get(method)
+        if handler is None:
+            reply(request_id, False, f"unknown method {method}")
+            return
+        try:
+            reply(request_id, True, await handler(*args))
+        except Exception as e:
+            traceback.print_exc()
+            reply(request_id, False, f"{type(e).__name__}: {e}")
+
+    def dispatch(request_id: int, method: str, args: Tuple) -> None:
+        if method == "stop":
+            stopped.set()
+            return
+        task = loop.create_task(handle(request_id, method, args))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    def read_requests() -> None:
+        while True:
+            try:
+                request_id, method, args = conn.recv()
+            except (EOFError, OSError):
+                break
+            loop.call_soon_threadsafe(dispatch, request_id, method, args)
+            if method == "stop":
+                return
+        # Front end went away
+        loop.call_soon_threadsafe(stopped.set)
+
+    threading.Thread(target=read_requests, name="shard-requests", daemon=True).start()
+    await stopped.wait()
+    for task in list(tasks):
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,244 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+# Columns kept outside the JSON blob so they can be inspected with plain SQL
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS automations (
+    automation_key TEXT PRIMARY KEY,
+    location TEXT NOT NULL,
+    user_email TEXT NOT NULL,
+    interval_seconds REAL NOT NULL,
+    total_times INTEGER NOT NULL,
+    executions_completed INTEGER NOT NULL,
+    next_due REAL,
+    info_json TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class AutomationStore:
+    """SQLite (WAL mode) persistence for running automations so they survive restarts.
+
+    submit_save / submit_delete run writes on one background thread, in the order they were
+    submitted, so the event loop never waits on SQLite or JSON encoding.
+    """
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="automation-store")
+
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def save(self, automation_key: str, info: Dict[str, Any], next_due: float | None) -> None:
+        """Insert or update an automation; next_due is a wall-clock timestamp (time.time())"""
+        if self._conn is None:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO automations (automation_key, location, user_email, interval_seconds, "
+                "total_times, executions_completed, next_due, info_json, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    automation_key,
+                    info['location'],
+                    info['user_email'],
+                    info['interval_seconds'],
+                    info['total_times'],
+                    info['executions_completed'],
+                    next_due,
+                    json.dumps(info),
+                    time.time(),
+                ),
+            )
+
+    def delete(self, automation_key: str) -> None:
+        if self._conn is None:
+            return
+
+        with self._lock:
+            self._conn.execute("DELETE FROM automations WHERE automation_key = ?", (automation_key,))
+
+    def submit_save(self, automation_key: str, info: Dict[str, Any], next_due: float | None) -> Future:
+        """save() on the writer thread; info must not change until the returned future is done"""
+        return self._writer.submit(self.save, automation_key, info, next_due)
+
+    def submit_delete(self, automation_key: str) -> Future:
+        """delete() on the writer thread, after every write submitted before it"""
+        future = self._writer.submit(self.delete, automation_key)
+        future.add_done_callback(_report_failed_write)
+        return future
+
+    def load_all(self) -> List[Tuple[str, Dict[str, Any], float | None]]:
+        """Return (automation_key, info, next_due) for every stored automation"""
+        if self._conn is None:
+            return []
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT automation_key, info_json, next_due FROM automations ORDER BY next_due"
+            ).fetchall()
+
+        automations = []
+        for automation_key, info_json, next_due in rows:
+            try:
+                automations.append((automation_key, json.loads(info_json), next_due))
+            except ValueError:
+                print(f"Skipping unreadable stored automation {automation_key}")
+        return automations
+
+    def close(self) -> None:
+        # Let submitted writes finish first
+        self._writer.shutdown(wait=True)
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def _report_failed_write(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Automation store write failed: {str(future.exception())}")
+
+
+_QUERY_RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_results (
+    backend TEXT NOT NULL,
+    query TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    results_json TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (backend, query, max_results)
+)
+"""
+_QUERY_RESULTS_INDEX = "CREATE INDEX IF NOT EXISTS query_results_stored_at ON query_results (stored_at)"
+
+# Prune the table (expired rows, rows over the limit) once every this many writes
+_QUERY_RESULTS_PRUNE_EVERY = 64
+
+
+class QueryResultStore:
+    """SQLite (WAL mode) cache of raw search responses keyed by (backend, query, max_results).
+
+    Entries expire ttl_seconds after they were fetched, wall-clock, so results fetched before a
+    restart are reused after it. The freshest max_entries are loaded into memory at startup, and the
+    table is pruned back to max_entries every few dozen writes. Several processes can share one file.
+    """
+
+    def __init__(self, path: str | None, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._memory: "OrderedDict[Tuple[str, str, int], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._writes = 0
+
+        if path and ttl_seconds > 0 and max_entries > 0:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_QUERY_RESULTS_SCHEMA)
+            self._conn.execute(_QUERY_RESULTS_INDEX)
+            self._warm()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def _warm(self) -> None:
+        with self._lock:
+            self._prune()
+            rows = self._conn.execute(
+                "SELECT backend, query, max_results, results_json, stored_at FROM query_results "
+                "ORDER BY stored_at LIMIT ?", (self.max_entries,)
+            ).fetchall()
+        for backend, query, max_results, results_json, stored_at in rows:
+            try:
+                self._memory[(backend, query, max_results)] = (stored_at, json.loads(results_json))
+            except ValueError:
+                continue
+        if self._memory:
+            print(f"Query result cache warmed with {len(self._memory)} stored responses")
+
+    def _prune(self) -> None:
+        self._conn.execute("DELETE FROM query_results WHERE stored_at <= ?", (time.time() - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM query_results WHERE rowid IN "
+            "(SELECT rowid FROM query_results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+        )
+
+    def get(self, backend: str, query: str, max_results: int) -> List[Dict[str, Any]] | None:
+        """Stored results if fetched less than ttl_seconds ago, else None"""
+        if self._conn is None:
+            return None
+
+        key = (backend, query, max_results)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                # Possibly stored by another process sharing the file
+                row = self._conn.execute(
+                    "SELECT stored_at, results_json FROM query_results "
+                    "WHERE backend = ? AND query = ? AND max_results = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                try:
+                    entry = (row[0], json.loads(row[1]))
+                except ValueError:
+                    return None
+                self._remember(key, entry)
+
+            stored_at, results = entry
+            if stored_at <= time.time() - self.ttl_seconds:
+                self._memory.pop(key, None)
+                return None
+            self._memory.move_to_end(key)
+            return results
+
+    def set(self, backend: str, query: str, max_results: int, results: List[Dict[str, Any]]) -> None:
+        if self._conn is None:
+            return
+
+        stored_at = time.time()
+        results_json = json.dumps(results)
+        with self._lock:
+            self._remember((backend, query, max_results), (stored_at, results))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_results (backend, query, max_results, results_json, stored_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (backend, query, max_results, results_json, stored_at),
+            )
+            self._writes += 1
+            if self._writes % _QUERY_RESULTS_PRUNE_EVERY == 0:
+                self._prune()
+
+    def _remember(self, key: Tuple[str, str, int], entry: Tuple[float, List[Dict[str, Any]]]) -> None:
+        # Called with self._lock held: get and set run on worker threads
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
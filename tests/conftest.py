@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Keep the module level stores in memory so importing utils leaves no files behind
+os.environ.setdefault("QUERY_CACHE_PATH", "")
+os.environ.setdefault("AUTOMATION_DB_PATH", "")
+os.environ.setdefault("SEARCH_RATE_PER_SECOND", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+from search_backends import _as_result, _feed_item
+from utils import _qualify_results
+
+
+def test_recent_feed_items_of_every_age_survive_qualification():
+    now = datetime.now(timezone.utc)
+    results = []
+    for hours in (2, 30, 54, 78):
+        item = _feed_item(
+            f"Flood warning for Springfield, item {hours}",
+            "Severe flooding, evacuation ordered.",
+            f"https://www.reuters.com/world/flood-{hours}",
+            (now - timedelta(hours=hours)).isoformat(),
+        )
+        results.append(_as_result(item))
+
+    alerts = _qualify_results("Springfield", [results], observe=False)
+    assert sorted(alert.url for alert in alerts) == sorted(result['href'] for result in results)
+
+
+def test_week_old_feed_items_are_dropped():
+    item = _feed_item(
+        "Flood warning for Springfield", "Severe flooding, evacuation ordered.",
+        "https://www.reuters.com/world/flood-old", (datetime.now(timezone.utc) - timedelta(days=8)).isoformat(),
+    )
+    assert _qualify_results("Springfield", [[_as_result(item)]], observe=False) == []
@@ -0,0 +1,34 @@
+from gazetteer import Gazetteer
+from utils import ALERT_CLASSIFIER
+
+
+def test_match_terms_keep_punctuation_of_unknown_places():
+    terms = Gazetteer(()).match_terms("St. Louis, Missouri")
+    assert "st. louis" in terms
+    assert "st louis" in terms
+    assert "missouri" in terms
+
+
+def test_punctuated_location_matches_result_text():
+    for location, title in [
+        ("St. Louis", "Flood warning issued for St. Louis"),
+        ("Coeur d'Alene, Idaho", "Wildfire forces evacuations near Coeur d'Alene"),
+    ]:
+        classification = ALERT_CLASSIFIER.classify(title, "Emergency crews respond.", "https://example.com/a", location)
+        assert classification.location_match, location
+
+
+def test_known_place_matches_its_own_spellings_whatever_the_alias():
+    gazetteer = Gazetteer([{'id': 'us-st-louis', 'name': 'St. Louis', 'aliases': ['Saint Louis'], 'within': ['Missouri']}])
+    terms = gazetteer.match_terms("St. Louis, Missouri")
+    assert {"st. louis", "st louis", "saint louis"} <= set(terms)
+    assert "missouri" not in terms
+    assert terms == gazetteer.match_terms("Saint Louis") == gazetteer.match_terms("us-st-louis")
+
+
+def test_region_of_a_known_place_does_not_match_other_places():
+    # Reports are shared under the canonical key, so "Delhi, India" must filter exactly like "Delhi"
+    title, snippet = "Earthquake hits Mumbai, India", "Buildings collapse, emergency declared."
+    for location in ("Delhi, India", "Delhi"):
+        classification = ALERT_CLASSIFIER.classify(title, snippet, "https://www.reuters.com/a", location)
+        assert not classification.location_match, location
@@ -0,0 +1,123 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator
+
+
+class Span:
+    """One timed stage of work; attributes can be added until the span ends"""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "started_at")
+
+    def __init__(self, trace_id: str, span_id: str, parent_id: str | None, name: str, attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    """Stand-in yielded when tracing is off or the trace was not sampled"""
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# Current span of this task/thread; _NOOP_SPAN marks a trace that was sampled out
+_current_span: ContextVar[Span | _NoopSpan | None] = ContextVar("automcp_current_span", default=None)
+
+# Sentinel for "use the current span as parent"
+_INHERIT = object()
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Tracer:
+    """Writes finished spans as JSON lines (OpenTelemetry-style ids, parent links and durations)"""
+
+    def __init__(self, path: str | None, sample_rate: float = 1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.sample_rate > 0
+
+    @contextmanager
+    def span(self, name: str, parent: Any = _INHERIT, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+        """Time the with-block as a span; children started inside it are linked to it"""
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        if parent is _INHERIT:
+            parent = _current_span.get()
+
+        if parent is _NOOP_SPAN or (parent is None and random.random() >= self.sample_rate):
+            token = _current_span.set(_NOOP_SPAN)
+            try:
+                yield _NOOP_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        trace_id = parent.trace_id if parent is not None else _new_id(128)
+        span = Span(trace_id, _new_id(64), parent.span_id if parent is not None else None, name, attributes)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self._export(span, time.perf_counter() - started, error)
+
+    def _export(self, span: Span, duration: float, error: str | None) -> None:
+        record = {
+            'trace_id': span.trace_id,
+            'span_id': span.span_id,
+            'parent_id': span.parent_id,
+            'name': span.name,
+            'start': round(span.started_at, 6),
+            'duration_ms': round(duration * 1000, 3),
+            'status': 'error' if error else 'ok',
+            'attributes': span.attributes,
+        }
+        if error:
+            record['error'] = error
+
+        line = json.dumps(record, default=str) + "\n"
+        try:
+            with self._lock:
+                if self._file is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._file = open(self.path, "a", buffering=1, encoding="utf-8")
+                self._file.write(line)
+        except OSError as e:
+            print(f"Failed to write trace span {span.name}: {str(e)}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
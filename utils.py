@@ -1,273 +1,574 @@
 import asyncio
+import hashlib
+import re
+from contextlib import nullcontext
 from datetime import datetime
-from ddgs import DDGS
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple
+from caching import SingleFlight, TTLCache
+from config import (
+    SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_EXECUTOR_WORKERS, SEARCH_RATE_PER_SECOND, SEARCH_RATE_BURST,
+    SEARCH_BACKENDS, SEARCH_FEED_PATHS, SEARCH_MERGE_DEADLINE_SECONDS,
+    QUERY_CACHE_PATH, QUERY_CACHE_TTL_SECONDS, QUERY_CACHE_MAX_ENTRIES,
+    TRACE_FILE, TRACE_SAMPLE_RATE, GAZETTEER_PATH, SEARCH_PLANNER_EXPLORE_EVERY, SEARCH_PLANNER_MIN_TEMPLATES,
+    SEARCH_QUERY_TIMEOUT_SECONDS, SEARCH_DEADLINE_SECONDS, SEARCH_QUERY_RETRIES, SEARCH_RETRY_BACKOFF_SECONDS,
+    SEARCH_HEDGE_AFTER_SECONDS, SEARCH_BREAKER_FAILURES, SEARCH_BREAKER_RESET_SECONDS,
+)
+from gazetteer import Gazetteer
+from metrics import (
+    FILTER_RESULTS, SEARCH_CACHE_LOOKUPS, SEARCH_QUERY_ERRORS, SEARCH_QUERY_SECONDS, SEARCH_QUERY_SKIPPED,
+    SEARCH_SECONDS,
+)
+from reports import Alert, DisasterReport, format_disaster_report
+from query_planner import QueryPlanner
+from resilience import CircuitBreaker, hedged
+from search_backends import CachingBackend, build_search_backend
+from search_executor import SearchExecutor
+from store import QueryResultStore
+from tracing import Tracer
 
-async def search_disaster_alerts(location: str) -> str:
-    """Search for emergency/disaster news from last 3 days only"""
-    print(f"🔍 Searching emergency/disaster alerts for: {location} (Last 3 days)")
-    
-    # Emergency keywords with stricter severity weights
-    emergency_keywords = {
-        # Critical disasters (severity 9-10)
-        'earthquake': 10, 'tsunami': 10, 'hurricane': 9, 'tornado': 9, 'cyclone': 9,
-        'wildfire': 9, 'major fire': 9, 'flood': 8, 'flash flood': 10, 'landslide': 9,
-        'volcano': 10, 'eruption': 10, 'explosion': 9, 'bombing': 10, 'terrorist': 10,
-        'shooting': 9, 'attack': 8, 'evacuation': 9, 'emergency': 7,
-        
-        # Severe weather/alerts (severity 7-8)
-        'severe storm': 8, 'blizzard': 8, 'severe weather': 7, 'emergency warning': 8,
-        'critical alert': 9, 'urgent alert': 8, 'immediate danger': 9, 'threat': 7,
-        
-        # Infrastructure/safety (severity 6-8)
-        'major accident': 7, 'train crash': 8, 'plane crash': 9, 'building collapse': 10,
-        'bridge collapse': 10, 'gas leak': 8, 'chemical spill': 9, 'toxic': 8,
-        'radiation': 10, 'nuclear': 10, 'contamination': 8,
-        
-        # Breaking emergency indicators
-        'breaking emergency': 9, 'urgent breaking': 8, 'emergency alert': 8,
-        'disaster alert': 8, 'crisis': 7, 'catastrophe': 9
-    }
-    
-    # Legitimate news sources (focus on major outlets)
-    trusted_news_sources = [
-        'cnn.com', 'bbc.com', 'reuters.com', 'ap.org', 'apnews.com', 'npr.org',
-        'abc.com', 'cbsnews.com', 'nbcnews.com', 'weather.com', 'usatoday.com',
-        'washingtonpost.com', 'bloomberg.com', 'theguardian.com', 'skynews.com'
-    ]
+# Canonical places and their aliases, so "Delhi", "New Delhi" and "Delhi, India" share one search
+GAZETTEER = Gazetteer.load(GAZETTEER_PATH)
+
+# Process-wide cache of finished searches, keyed by normalized location
+SEARCH_CACHE = TTLCache(SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_MAX_ENTRIES)
+
+# Concurrent searches for the same normalized location share one in-flight run
+SEARCH_FLIGHTS = SingleFlight()
+
+# Dedicated, rate limited thread pool for the blocking DDGS calls
+SEARCH_EXECUTOR = SearchExecutor(SEARCH_EXECUTOR_WORKERS, SEARCH_RATE_PER_SECOND, SEARCH_RATE_BURST)
+
+# One circuit breaker per query template, so a template that keeps failing is skipped for a while
+QUERY_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+# Timeout of DDGS's own HTTP requests, so abandoned queries free their executor thread too
+DDGS_TIMEOUT = max(1, int(SEARCH_QUERY_TIMEOUT_SECONDS)) if SEARCH_QUERY_TIMEOUT_SECONDS > 0 else 5
+
+# Callbacks for partial reports of in-flight searches, by normalized location
+PartialListener = Callable[[DisasterReport, int, int], None]
+SEARCH_PARTIAL_LISTENERS: Dict[str, List[PartialListener]] = {}
+
+# Raw responses of recent queries, on disk so a restarted process starts warm
+QUERY_CACHE = QueryResultStore(QUERY_CACHE_PATH, QUERY_CACHE_TTL_SECONDS, QUERY_CACHE_MAX_ENTRIES)
+
+# Where search results come from (DDGS, offline feeds, or several merged)
+SEARCH_BACKEND = build_search_backend(
+    SEARCH_BACKENDS, SEARCH_EXECUTOR, DDGS_TIMEOUT, SEARCH_FEED_PATHS, SEARCH_MERGE_DEADLINE_SECONDS
+)
+if QUERY_CACHE.enabled:
+    SEARCH_BACKEND = CachingBackend(SEARCH_BACKEND, QUERY_CACHE)
+
+# Optional per-stage tracing of searches (JSON lines), off unless TRACE_FILE is set
+TRACER = Tracer(TRACE_FILE, TRACE_SAMPLE_RATE)
+
+
+# Focused search query templates for EMERGENCY NEWS ONLY, by name
+SEARCH_QUERY_TEMPLATES = {
+    'breaking': "{location} breaking emergency disaster today news",
+    'weather': "{location} urgent alert weather warning earthquake fire flood",
+    'services': "{location} emergency services news disaster alert",
+    'breaking_news': "\"breaking news\" {location} emergency disaster alert",
+    'alert_phrases': "{location} \"emergency alert\" OR \"disaster alert\" OR \"urgent warning\"",
+    'trusted_sites': "site:cnn.com OR site:bbc.com OR site:reuters.com {location} emergency disaster",
+}
+
+# Which templates to run for each location, from what each has been finding there
+QUERY_PLANNER = QueryPlanner(SEARCH_QUERY_TEMPLATES, SEARCH_PLANNER_EXPLORE_EVERY, SEARCH_PLANNER_MIN_TEMPLATES)
+
+# Emergency keywords with stricter severity weights
+EMERGENCY_KEYWORDS = {
+    # Critical disasters (severity 9-10)
+    'earthquake': 10, 'tsunami': 10, 'hurricane': 9, 'tornado': 9, 'cyclone': 9,
+    'wildfire': 9, 'major fire': 9, 'flood': 8, 'flash flood': 10, 'landslide': 9,
+    'volcano': 10, 'eruption': 10, 'explosion': 9, 'bombing': 10, 'terrorist': 10,
+    'shooting': 9, 'attack': 8, 'evacuation': 9, 'emergency': 7,
     
-    # Create focused search queries for EMERGENCY NEWS ONLY
-    search_queries = [
-        f"{location} breaking emergency disaster today news",
-        f"{location} urgent alert weather warning earthquake fire flood",
-        f"{location} emergency services news disaster alert",
-        f"\"breaking news\" {location} emergency disaster alert",
-        f"{location} \"emergency alert\" OR \"disaster alert\" OR \"urgent warning\"",
-        f"site:cnn.com OR site:bbc.com OR site:reuters.com {location} emergency disaster"
-    ]
+    # Severe weather/alerts (severity 7-8)
+    'severe storm': 8, 'blizzard': 8, 'severe weather': 7, 'emergency warning': 8,
+    'critical alert': 9, 'urgent alert': 8, 'immediate danger': 9, 'threat': 7,
     
-    # Function to check if content is within last 3 days
-    def is_within_3_days(title: str, snippet: str) -> bool:
-        content = (title + " " + snippet).lower()
-        
-        # Strong indicators of very recent content (last 3 days)
-        very_recent_indicators = [
-            'today', 'now', 'live', 'breaking', 'just in', 'current',
-            'minutes ago', 'hour ago', 'hours ago', 'this morning', 
-            'this afternoon', 'this evening', 'tonight', 'latest',
-            'developing', 'ongoing', 'right now', 'currently happening'
-        ]
-        
-        # Recent indicators (within 3 days)
-        recent_indicators = [
-            'yesterday', 'last night', 'early today', 'late yesterday',
-            'two days ago', 'three days ago', '48 hours', '72 hours'
-        ]
-        
-        # Strong exclusion indicators (clearly old content)
-        old_indicators = [
-            'last week', 'last month', 'days ago', 'weeks ago', 'months ago',
-            'last year', 'years ago', 'archive', 'historical', 'past',
-            'former', 'previous', 'earlier this week', 'earlier this month',
-            'four days ago', 'five days ago', 'week ago', 'annual', 'anniversary'
-        ]
-        
-        # Immediate exclusion for old content
-        if any(indicator in content for indicator in old_indicators):
-            return False
-        
-        # Check for recent indicators
-        has_very_recent = any(indicator in content for indicator in very_recent_indicators)
-        has_recent = any(indicator in content for indicator in recent_indicators)
-        
-        # Must have recent indicators for 3-day filter
-        return has_very_recent or has_recent
+    # Infrastructure/safety (severity 6-8)
+    'major accident': 7, 'train crash': 8, 'plane crash': 9, 'building collapse': 10,
+    'bridge collapse': 10, 'gas leak': 8, 'chemical spill': 9, 'toxic': 8,
+    'radiation': 10, 'nuclear': 10, 'contamination': 8,
     
-    # Function to calculate severity score with stricter criteria
-    def calculate_severity_score(title: str, snippet: str) -> tuple[int, str]:
+    # Breaking emergency indicators
+    'breaking emergency': 9, 'urgent breaking': 8, 'emergency alert': 8,
+    'disaster alert': 8, 'crisis': 7, 'catastrophe': 9
+}
+
+# Strong breaking news indicators (boost severity by one)
+BREAKING_INDICATORS = ['breaking', 'urgent', 'emergency alert', 'disaster alert']
+
+# Strong indicators of very recent content (last 3 days)
+VERY_RECENT_INDICATORS = [
+    'today', 'now', 'live', 'breaking', 'just in', 'current',
+    'minutes ago', 'hour ago', 'hours ago', 'this morning', 
+    'this afternoon', 'this evening', 'tonight', 'latest',
+    'developing', 'ongoing', 'right now', 'currently happening'
+]
+
+# Recent indicators (within 3 days)
+RECENT_INDICATORS = [
+    'yesterday', 'last night', 'early today', 'late yesterday',
+    'two days ago', 'three days ago', '48 hours', '72 hours'
+]
+
+# Strong exclusion indicators (clearly old content)
+OLD_INDICATORS = [
+    'last week', 'last month', 'days ago', 'weeks ago', 'months ago',
+    'last year', 'years ago', 'archive', 'historical', 'past',
+    'former', 'previous', 'earlier this week', 'earlier this month',
+    'four days ago', 'five days ago', 'week ago', 'annual', 'anniversary'
+]
+
+# Legitimate news sources (focus on major outlets)
+TRUSTED_NEWS_SOURCES = [
+    'cnn.com', 'bbc.com', 'reuters.com', 'ap.org', 'apnews.com', 'npr.org',
+    'abc.com', 'cbsnews.com', 'nbcnews.com', 'weather.com', 'usatoday.com',
+    'washingtonpost.com', 'bloomberg.com', 'theguardian.com', 'skynews.com'
+]
+
+# News indicators looked for in the URL or title
+NEWS_INDICATORS = ['news', 'breaking', 'report', 'alert', 'press']
+
+
+def _trie_regex(terms) -> str:
+    """Build a regex that matches the longest of terms at a position, factored as a prefix trie"""
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A term ends here but longer terms continue: prefer the longer one, fall back to this one
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class AlertClassification(NamedTuple):
+    severity: int
+    emoji: str
+    recency: str            # 'very_recent', 'recent', 'old' or 'undated'
+    is_recent: bool
+    is_breaking: bool
+    is_news_source: bool
+    location_match: bool
+    matched_keywords: tuple
+
+
+class AlertClassifier:
+    """Classify a search result with one compiled pattern pass over its lowercased text"""
+
+    def __init__(self, emergency_keywords: Dict[str, int], breaking_indicators, very_recent_indicators,
+                 recent_indicators, old_indicators, trusted_sources, news_indicators, gazetteer: Gazetteer):
+        self.emergency_keywords = dict(emergency_keywords)
+        self.breaking_indicators = frozenset(breaking_indicators)
+        self.very_recent_indicators = frozenset(very_recent_indicators)
+        self.recent_indicators = frozenset(recent_indicators)
+        self.old_indicators = frozenset(old_indicators)
+        self.trusted_sources = frozenset(trusted_sources)
+        self.news_indicators = frozenset(news_indicators)
+        self.gazetteer = gazetteer
+
+        self._base_terms = frozenset().union(
+            self.emergency_keywords, self.breaking_indicators, self.very_recent_indicators,
+            self.recent_indicators, self.old_indicators, self.trusted_sources, self.news_indicators,
+        )
+        self._base_pattern, self._base_plan = self._compile(self._base_terms)
+
+    @staticmethod
+    def _compile(terms) -> tuple[re.Pattern, Dict[str, tuple]]:
+        pattern = re.compile(_trie_regex(terms))
+        plan = {}
+        for term in terms:
+            # Terms hidden inside a match (the regex consumes it and reports only the longest term)
+            contained = tuple((other, term.index(other) + len(other)) for other in terms if other in term)
+            # Offsets inside the match where another term could start and run past its end
+            overlaps = tuple(
+                offset for offset in range(1, len(term))
+                if any(other.startswith(term[offset:]) and len(other) > len(term) - offset for other in terms)
+            )
+            plan[term] = (contained, overlaps)
+        return pattern, plan
+
+    @lru_cache(maxsize=256)
+    def _location_matcher(self, location: str) -> tuple[re.Pattern, Dict[str, tuple], frozenset]:
+        # Every alias of a known place counts as a match, plus the location as typed and its comma parts
+        location_terms = frozenset(self.gazetteer.match_terms(location))
+        pattern, plan = self._compile(self._base_terms | location_terms)
+        return pattern, plan, location_terms
+
+    @staticmethod
+    def _scan(pattern: re.Pattern, plan: Dict[str, tuple], text: str) -> Dict[str, int]:
+        """Return every term found in text mapped to the end offset of its first occurrence"""
+        found: Dict[str, int] = {}
+
+        def record(term: str, start: int) -> None:
+            contained, overlaps = plan[term]
+            for other, end in contained:
+                if other not in found or start + end < found[other]:
+                    found[other] = start + end
+            # Rare case: a term starting inside this match and extending beyond it
+            for offset in overlaps:
+                overlap = pattern.match(text, start + offset)
+                if overlap is not None:
+                    record(overlap.group(), start + offset)
+
+        for match in pattern.finditer(text):
+            term = match.group()
+            # A repeated term cannot move any first occurrence earlier
+            if term in found and not plan[term][1]:
+                continue
+            record(term, match.start())
+        return found
+
+    def classify(self, title: str, snippet: str, url: str, location: str) -> AlertClassification:
         content = (title + " " + snippet).lower()
-        max_severity = 0
-        matched_keywords = []
-        
-        for keyword, severity in emergency_keywords.items():
-            if keyword in content:
-                max_severity = max(max_severity, severity)
-                matched_keywords.append(keyword)
-        
-        # Boost score for multiple emergency keywords
+        pattern, plan, location_terms = self._location_matcher(location)
+        hits = self._scan(pattern, plan, content)
+        hit_terms = hits.keys()
+
+        # Severity: strongest keyword, boosted for multiple keywords and breaking indicators
+        matched_keywords = tuple(term for term in hits if term in self.emergency_keywords)
+        severity = max((self.emergency_keywords[term] for term in matched_keywords), default=0)
         if len(matched_keywords) > 1:
-            max_severity = min(10, max_severity + 1)
-        
-        # Boost for strong breaking news indicators
-        breaking_indicators = ['breaking', 'urgent', 'emergency alert', 'disaster alert']
-        if any(indicator in content for indicator in breaking_indicators):
-            max_severity = min(10, max_severity + 1)
-        
+            severity = min(10, severity + 1)
+        is_breaking = not self.breaking_indicators.isdisjoint(hit_terms)
+        if is_breaking:
+            severity = min(10, severity + 1)
+
         # Determine emoji based on severity
-        if max_severity >= 9:
+        if severity >= 9:
             emoji = "🚨"  # Critical emergency
-        elif max_severity >= 8:
+        elif severity >= 8:
             emoji = "🔴"  # High severity
-        elif max_severity >= 7:
+        elif severity >= 7:
             emoji = "🟠"  # Significant
-        elif max_severity >= 6:
+        elif severity >= 6:
             emoji = "🟡"  # Moderate
         else:
             emoji = "🟢"  # Advisory
-        
-        return max_severity, emoji
-    
-    # Function to check if source is legitimate news
-    def is_legitimate_news_source(url: str, title: str) -> bool:
-        url_lower = url.lower()
-        title_lower = title.lower()
-        
-        # Prioritize trusted news sources
-        for trusted in trusted_news_sources:
-            if trusted in url_lower:
-                return True
-        
-        # Check for news indicators
-        news_indicators = ['news', 'breaking', 'report', 'alert', 'press']
-        return any(indicator in url_lower or indicator in title_lower for indicator in news_indicators)
+
+        # Recency: any old indicator excludes, otherwise require a recent indicator
+        if not self.old_indicators.isdisjoint(hit_terms):
+            recency = 'old'
+        elif not self.very_recent_indicators.isdisjoint(hit_terms):
+            recency = 'very_recent'
+        elif not self.recent_indicators.isdisjoint(hit_terms):
+            recency = 'recent'
+        else:
+            recency = 'undated'
+
+        # Source: trusted outlet or news indicator in the URL, or a news indicator in the title
+        title_length = len(title)
+        is_news_source = any(
+            term in self.news_indicators and end <= title_length for term, end in hits.items()
+        )
+        if not is_news_source:
+            url_terms = self._scan(self._base_pattern, self._base_plan, url.lower()).keys()
+            is_news_source = not (self.trusted_sources.isdisjoint(url_terms)
+                                  and self.news_indicators.isdisjoint(url_terms))
+
+        return AlertClassification(
+            severity=severity,
+            emoji=emoji,
+            recency=recency,
+            is_recent=recency in ('very_recent', 'recent'),
+            is_breaking=is_breaking,
+            is_news_source=is_news_source,
+            location_match=not location_terms.isdisjoint(hit_terms),
+            matched_keywords=matched_keywords,
+        )
+
+
+# Built once at import time and shared by every search
+ALERT_CLASSIFIER = AlertClassifier(
+    EMERGENCY_KEYWORDS, BREAKING_INDICATORS, VERY_RECENT_INDICATORS, RECENT_INDICATORS,
+    OLD_INDICATORS, TRUSTED_NEWS_SOURCES, NEWS_INDICATORS, GAZETTEER,
+)
+
+
+def normalize_location(location: str) -> str:
+    """Canonical key of a user supplied location (gazetteer place ID or cleaned text).
+
+    Equivalent spellings and aliases share one key, and so one cache entry, search and automation.
+    """
+    return GAZETTEER.canonical_key(location)
+
+
+def alert_fingerprint(title: str, snippet: str) -> str:
+    """Stable content hash of an alert, used to recognise the same story under another URL"""
+    content = " ".join((title + " " + snippet).lower().split())
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+
+async def search_disaster_report(location: str, on_partial: PartialListener | None = None) -> DisasterReport:
+    """Search for qualified emergency alerts from last 3 days, reusing a fresh cached report if any.
+
+    on_partial(report, answered, total) is called with a re-ranked partial report each time
+    another query of the search answers, whether this call started the search or joined it.
+    """
+    with TRACER.span("search", location=location) as span:
+        cache_key = normalize_location(location)
+        cached_result = SEARCH_CACHE.get(cache_key)
+        if cached_result is not None:
+            SEARCH_CACHE_LOOKUPS.inc(result="hit")
+            span.set(cache="hit")
+            print(f"♻️ Using cached alerts for: {location}")
+            return cached_result.for_location(location)
+
+        if SEARCH_FLIGHTS.in_flight(cache_key):
+            SEARCH_CACHE_LOOKUPS.inc(result="coalesced")
+            span.set(cache="coalesced")
+            print(f"⏳ Joining in-flight search for: {location}")
+        else:
+            SEARCH_CACHE_LOOKUPS.inc(result="miss")
+            span.set(cache="miss")
+
+        async def run_search() -> DisasterReport:
+            with SEARCH_SECONDS.time():
+                report = await _search_disaster_report_uncached(location)
+            SEARCH_CACHE.set(cache_key, report)
+            return report
+
+        listener = None
+        if on_partial is not None:
+            def listener(report: DisasterReport, answered: int, total: int) -> None:
+                on_partial(report.for_location(location), answered, total)
+            SEARCH_PARTIAL_LISTENERS.setdefault(cache_key, []).append(listener)
+        try:
+            report = await SEARCH_FLIGHTS.do(cache_key, run_search)
+        finally:
+            if listener is not None:
+                listeners = SEARCH_PARTIAL_LISTENERS[cache_key]
+                listeners.remove(listener)
+                if not listeners:
+                    del SEARCH_PARTIAL_LISTENERS[cache_key]
+        span.set(alerts=report.incident_count)
+        return report.for_location(location)
+
+
+async def search_disaster_alerts(location: str, on_partial: PartialListener | None = None) -> str:
+    """Search for emergency/disaster news from last 3 days and format it as a report"""
+    with TRACER.span("search_disaster_alerts", location=location):
+        report = await search_disaster_report(location, on_partial)
+        with TRACER.span("search.format"):
+            return format_disaster_report(report)
+
+
+async def _run_search_query(owner: str, template_name: str, query: str, max_results: int = 8, parent_span=None) -> list:
+    """One search backend query, timed per query template"""
+    with TRACER.span("search.query", parent=parent_span, template=template_name, max_results=max_results) as span:
+        try:
+            with SEARCH_QUERY_SECONDS.time(template=template_name):
+                results = await SEARCH_BACKEND.search(query, max_results, owner)
+        except Exception:
+            SEARCH_QUERY_ERRORS.inc(template=template_name)
+            raise
+        span.set(results=len(results))
+        return results
+
+
+async def _run_search_query_resilient(owner: str, template_name: str, query: str, max_results: int = 8,
+                                      parent_span=None) -> list | None:
+    """Run one query with a timeout, optional hedging and retries, behind its template's circuit breaker.
+
+    Returns None instead of raising when the query could not be answered.
+    """
+    breaker = QUERY_BREAKERS.setdefault(
+        template_name, CircuitBreaker(SEARCH_BREAKER_FAILURES, SEARCH_BREAKER_RESET_SECONDS)
+    )
+    if not breaker.allow():
+        SEARCH_QUERY_SKIPPED.inc(template=template_name, reason="circuit_open")
+        return None
+
+    def call():
+        return _run_search_query(owner, template_name, query, max_results, parent_span)
+
+    try:
+        for attempt in range(SEARCH_QUERY_RETRIES + 1):
+            try:
+                results = await asyncio.wait_for(
+                    hedged(call, SEARCH_HEDGE_AFTER_SECONDS), SEARCH_QUERY_TIMEOUT_SECONDS or None
+                )
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    SEARCH_QUERY_ERRORS.inc(template=template_name)
+                print(f"Search query '{template_name}' failed (attempt {attempt + 1}): {type(e).__name__} {str(e)}")
+                if attempt < SEARCH_QUERY_RETRIES:
+                    await asyncio.sleep(SEARCH_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+                continue
+            breaker.record_success()
+            return results
+    except asyncio.CancelledError:
+        # Cut off by the overall deadline
+        breaker.record_failure()
+        raise
+
+    breaker.record_failure()
+    return None
+
+
+def _filter_stage(stage: str, items: list, keep) -> list:
+    """Apply one filter stage, counting and tracing what it drops"""
+    with TRACER.span(f"search.filter.{stage}", input=len(items)) as span:
+        kept = [item for item in items if keep(item)]
+        span.set(kept=len(kept))
+    FILTER_RESULTS.inc(len(items) - len(kept), stage=stage, outcome="dropped")
+    return kept
+
+
+def _qualify_results(location: str, all_search_results: list, observe: bool = True) -> list:
+    """Dedup, classify, filter and rank raw query results into alerts, most severe first.
+
+    observe=False skips metrics and spans, for the throwaway partial reports of a streaming search.
+    """
+    def stage(name: str, items: list, keep) -> list:
+        return _filter_stage(name, items, keep) if observe else [item for item in items if keep(item)]
     
-    # Function to check location relevance
-    def is_location_relevant(title: str, snippet: str, target_location: str) -> bool:
-        content = (title + " " + snippet).lower()
-        target_lower = target_location.lower()
-        
-        # Check for exact location match
-        if target_lower in content:
-            return True
-        
-        # Check for location variations
-        if ',' in target_location:
-            parts = [part.strip() for part in target_location.split(',')]
-            for part in parts:
-                if part.lower() in content:
-                    return True
-        
-        return False
+    def span(name: str, **attributes):
+        return TRACER.span(name, **attributes) if observe else nullcontext()
     
-    # Perform searches in parallel
-    print(f"Starting {len(search_queries)} focused emergency searches...")
-    search_tasks = [
-        asyncio.get_event_loop().run_in_executor(
-            None, 
-            lambda q=query: list(DDGS().text(q, max_results=8))
-        ) for query in search_queries
-    ]
-    all_search_results = await asyncio.gather(*search_tasks)
+    # Process and filter results, one stage at a time
+    results = [result for results in all_search_results for result in results]
     
-    # Process and filter results
-    qualified_news = []
+    # Skip duplicates
     seen_urls = set()
     
-    for results in all_search_results:
-        for result in results:
-            title = result.get("title", "")
-            url = result.get("href", "")
-            snippet = result.get("body", "")
-            
-            # Skip duplicates
-            if url in seen_urls or not url:
-                continue
-            seen_urls.add(url)
-            
-            # Only include legitimate news sources
-            if not is_legitimate_news_source(url, title):
-                continue
-            
-            # Only include content from last 3 days
-            if not is_within_3_days(title, snippet):
-                continue
-            
-            # Check location relevance
-            if not is_location_relevant(title, snippet, location):
-                continue
-            
-            # Calculate severity score
-            severity, emoji = calculate_severity_score(title, snippet)
-            
-            # Only include emergency-level news (severity >= 7)
-            if severity < 7:
-                continue
-            
-            qualified_news.append({
-                'title': title,
-                'snippet': snippet,
-                'url': url,
-                'severity': severity,
-                'emoji': emoji
-            })
+    def first_sighting(result) -> bool:
+        url = result.get("href", "")
+        if not url or url in seen_urls:
+            return False
+        seen_urls.add(url)
+        return True
+    
+    results = stage("dedup", results, first_sighting)
+    
+    # Single pass over the text for source, recency, location and severity
+    with span("search.filter.classify", input=len(results)):
+        classified = [
+            (result, ALERT_CLASSIFIER.classify(
+                result.get("title", ""), result.get("body", ""), result.get("href", ""), location
+            ))
+            for result in results
+        ]
+    
+    # Only include legitimate news sources
+    classified = stage("source", classified, lambda item: item[1].is_news_source)
+    
+    # Only include content from last 3 days
+    classified = stage("recency", classified, lambda item: item[1].is_recent)
+    
+    # Check location relevance
+    classified = stage("location", classified, lambda item: item[1].location_match)
+    
+    # Only include emergency-level news (severity >= 7)
+    classified = stage("severity", classified, lambda item: item[1].severity >= 7)
+    if observe:
+        FILTER_RESULTS.inc(len(classified), stage="severity", outcome="passed")
+    
+    qualified_news = [
+        Alert(
+            title=result.get("title", ""),
+            snippet=result.get("body", ""),
+            url=result.get("href", ""),
+            severity=classification.severity,
+            emoji=classification.emoji,
+            fingerprint=alert_fingerprint(result.get("title", ""), result.get("body", "")),
+        )
+        for result, classification in classified
+    ]
     
     # Sort by severity (highest first)
-    qualified_news.sort(key=lambda x: x['severity'], reverse=True)
+    with span("search.rank", input=len(qualified_news)):
+        qualified_news.sort(key=lambda x: x.severity, reverse=True)
+    return qualified_news
+
+
+def _notify_partial(cache_key: str, report: DisasterReport, answered: int, total: int) -> None:
+    for listener in list(SEARCH_PARTIAL_LISTENERS.get(cache_key, ())):
+        try:
+            listener(report, answered, total)
+        except Exception as e:
+            print(f"Partial report listener failed: {type(e).__name__} {str(e)}")
+
+
+async def _search_disaster_report_uncached(location: str) -> DisasterReport:
+    """Search for emergency/disaster news from last 3 days only"""
+    print(f"🔍 Searching emergency/disaster alerts for: {location} (Last 3 days)")
     
-    # Limit to top 5 most severe results
-    qualified_news = qualified_news[:5]
+    # Only the templates that have been finding this location's alerts, see QueryPlanner
+    owner = normalize_location(location)
+    plan = QUERY_PLANNER.plan(owner)
+    for template_name in SEARCH_QUERY_TEMPLATES.keys() - {template_name for template_name, _ in plan}:
+        SEARCH_QUERY_SKIPPED.inc(template=template_name, reason="low_yield")
     
-    # Format results
-    if qualified_news:
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-        max_severity = max(item['severity'] for item in qualified_news)
-        header_emoji = "🚨" if max_severity >= 9 else "🔴" if max_severity >= 8 else "🟠"
-        
-        response_parts = [
-            f"**{header_emoji} EMERGENCY ALERTS for {location}**",
-            f"**Search Time:** {current_time}",
-            f"**Time Frame:** Last 3 days only",
-            f"**Found {len(qualified_news)} critical emergency alerts (severity ≥7/10)**\n"
-        ]
-        
-        # Group by severity
-        critical = [item for item in qualified_news if item['severity'] >= 9]
-        high = [item for item in qualified_news if 8 <= item['severity'] < 9]
-        significant = [item for item in qualified_news if 7 <= item['severity'] < 8]
-        
-        if critical:
-            response_parts.append("**🚨 CRITICAL EMERGENCIES (Severity 9-10):**")
-            for i, item in enumerate(critical, 1):
-                response_parts.extend([
-                    f"**{i}. {item['emoji']} [{item['severity']}/10] {item['title']}**",
-                    f"📰 {item['snippet']}" if item['snippet'] else "📝 No preview available",
-                    f"🔗 {item['url']}\n"
-                ])
-        
-        if high:
-            response_parts.append("**🔴 HIGH SEVERITY (Severity 8):**")
-            for i, item in enumerate(high, 1):
-                response_parts.extend([
-                    f"**{i}. {item['emoji']} [{item['severity']}/10] {item['title']}**",
-                    f"📰 {item['snippet']}" if item['snippet'] else "📝 No preview available",
-                    f"🔗 {item['url']}\n"
-                ])
-        
-        if significant:
-            response_parts.append("**🟠 SIGNIFICANT ALERTS (Severity 7):**")
-            for i, item in enumerate(significant, 1):
-                response_parts.extend([
-                    f"**{i}. {item['emoji']} [{item['severity']}/10] {item['title']}**",
-                    f"📰 {item['snippet']}" if item['snippet'] else "📝 No preview available",
-                    f"🔗 {item['url']}\n"
-                ])
+    # Known places are searched under their canonical name, whichever alias the caller used
+    search_location = GAZETTEER.search_name(location)
+    search_queries = [
+        (template_name, SEARCH_QUERY_TEMPLATES[template_name].format(location=search_location), max_results)
+        for template_name, max_results in plan
+    ]
+    
+    # Perform searches in parallel
+    print(f"Starting {len(search_queries)} focused emergency searches...")
+    loop = asyncio.get_running_loop()
+    with TRACER.span("search.gather", queries=len(search_queries)) as gather_span:
+        search_tasks = {
+            asyncio.ensure_future(
+                _run_search_query_resilient(owner, template_name, query, max_results, gather_span)
+            ): template_name
+            for template_name, query, max_results in search_queries
+        }
         
-        response_parts.extend([
-            "**Sources:** Major news outlets and verified channels",
-            "**Note:** Only emergency-level incidents from last 3 days. Verify with official sources."
-        ])
+        def answered() -> list:
+            # In template order, so the ranking does not depend on which query returned first
+            return [task.result() for task in search_tasks if task.done() and task.result() is not None]
         
-        response_text = "\n".join(response_parts)
-    else:
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-        response_text = (
-            f"**NO CRITICAL EMERGENCY ALERTS for {location}**\n\n"
-            f"**Search Time:** {current_time}\n"
-            f"**Time Frame:** Last 3 days\n"
-            f"**Location:** {location}\n\n"
-            f"**Searched:** Major news outlets for emergency-level incidents\n"
-            f"**Emergency Threshold:** Severity ≥7/10\n"
-            f"**Status:** No critical emergency or disaster alerts detected\n\n"
-            f"**🎉 Good News!** No critical emergency alerts found from verified news sources for your location in the last 3 days."
-        )
+        # Take queries as they complete; listeners get a re-ranked partial report after each one.
+        # Overall deadline: queries still running then are dropped and the report uses the rest
+        deadline = loop.time() + SEARCH_DEADLINE_SECONDS if SEARCH_DEADLINE_SECONDS > 0 else None
+        pending = set(search_tasks)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            if pending and SEARCH_PARTIAL_LISTENERS.get(owner) and any(task.result() is not None for task in done):
+                partial_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+                partial_news = _qualify_results(location, answered(), observe=False)[:5]
+                partial = DisasterReport.build(location, partial_time, partial_news)
+                _notify_partial(owner, partial, len(search_tasks) - len(pending), len(search_tasks))
+        for task in pending:
+            task.cancel()
+            SEARCH_QUERY_SKIPPED.inc(template=search_tasks[task], reason="deadline")
+        all_search_results = answered()
+        gather_span.set(succeeded=len(all_search_results), missed=len(search_queries) - len(all_search_results))
+    
+    if not all_search_results:
+        raise RuntimeError(f"All {len(search_queries)} search queries failed for {location}")
+    if len(all_search_results) < len(search_queries):
+        print(f"Using {len(all_search_results)}/{len(search_queries)} search queries for {location}")
+    
+    qualified_news = _qualify_results(location, all_search_results)
+    QUERY_PLANNER.record(
+        owner, plan,
+        {search_tasks[task]: task.result() for task in search_tasks if task.done() and task.result() is not None},
+        {alert.url for alert in qualified_news},
+    )
+    
+    # Limit to top 5 most severe results
+    qualified_news = qualified_news[:5]
     
-    return response_text
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+    return DisasterReport.build(location, current_time, qualified_news)